@@ -0,0 +1,53 @@
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response  # type: ignore
+
+from app.crud.change_tracker import Version
+
+
+def etag(version: Version) -> str:
+    return f'"{version.number}"'
+
+
+def set_validators(response: Response, version: Version):
+    """
+    ETag and Last-Modified for a response built from data at `version`. Read the
+    version before querying: a write landing in between then only costs the
+    client one extra full response.
+    """
+    response.headers["ETag"] = etag(version)
+    response.headers["Last-Modified"] = format_datetime(version.modifiedAt, usegmt=True)
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def _is_fresh(request: Request, version: Version) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag(version) in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # Last-Modified has whole-second resolution and a second commit within the
+    # same second keeps it, so only a strictly older version is known to match.
+    # ETags are exact and take precedence above.
+    return since.tzinfo is not None and version.modifiedAt < since
+
+
+def not_modified(request: Request, version: Version) -> Optional[Response]:
+    """
+    A 304 response when the request's If-None-Match (or, without one, its
+    If-Modified-Since) shows the client already has `version`, else None.
+    """
+    if not _is_fresh(request, version):
+        return None
+    response = Response(status_code=304)
+    set_validators(response, version)
+    return response
@@ -0,0 +1,96 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Sequence
+
+from fastapi import HTTPException, Query, Request, Response  # type: ignore
+
+from app.crud.pagination import SortKey
+
+DEFAULT_PAGE_SIZE = int(os.getenv("API_DEFAULT_PAGE_SIZE", "500"))
+MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "2000"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page(NamedTuple):
+    after: Optional[SortKey]
+    limit: int
+
+
+class PageParams:
+    """
+    `cursor`/`limit` query parameters of a keyset-paginated list endpoint. The
+    cursor is opaque to clients; the next one is sent in the X-Next-Cursor
+    header and as a rel="next" Link, and is absent on the last page.
+    `key_types` are the types of the endpoint's sort key, one per column.
+    """
+
+    def __init__(
+        self, key_types: Sequence[type], default_limit: int = DEFAULT_PAGE_SIZE
+    ):
+        self.key_types = tuple(key_types)
+        self.default_limit = default_limit
+
+    def __call__(
+        self,
+        cursor: Optional[str] = Query(
+            None, description="Cursor from the X-Next-Cursor header of the last page"
+        ),
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    ) -> Page:
+        return Page(decode_cursor(cursor, self.key_types), limit or self.default_limit)
+
+
+def _encode_value(value: Any):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def _decode_value(obj: dict):
+    return datetime.fromisoformat(obj["dt"]) if "dt" in obj else obj
+
+
+def encode_cursor(key: SortKey) -> str:
+    raw = json.dumps(list(key), default=_encode_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _is_key_value(value: Any, key_type: type) -> bool:
+    # bool is an int subclass, but never a valid id.
+    return isinstance(value, key_type) and not isinstance(value, bool)
+
+
+def decode_cursor(
+    cursor: Optional[str], key_types: Sequence[type]
+) -> Optional[SortKey]:
+    """
+    The sort key encoded in `cursor`, which must have one value of each of
+    `key_types` in order; anything else is a 400 rather than a failing query.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw, object_hook=_decode_value)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if not (
+        isinstance(key, list)
+        and len(key) == len(key_types)
+        and all(map(_is_key_value, key, key_types))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return tuple(key)
+
+
+def set_next_page_headers(
+    request: Request, response: Response, next_key: Optional[SortKey]
+):
+    if next_key is None:
+        return
+    cursor = encode_cursor(next_key)
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    next_url = request.url.include_query_params(cursor=cursor)
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException  # type: ignore
+from fastapi import APIRouter, Depends, HTTPException, Request, Response  # type: ignore
 from sqlalchemy.orm import Session
 from typing import List
 
+from app.api.conditional import not_modified, set_validators
 from app.db import schemas
-from app.crud import airline
+from app.crud import airline, change_tracker
 from app.db.session import SessionLocal
 
 router = APIRouter(prefix="/airlines", tags=["airlines"])
@@ -18,7 +19,11 @@ def get_db():
 
 
 @router.get("/", response_model=List[schemas.AirlineOut])
-def read_airlines(db: Session = Depends(get_db)):
+def read_airlines(request: Request, response: Response, db: Session = Depends(get_db)):
+    version = change_tracker.table_version(db, change_tracker.AIRLINES)
+    if (cached := not_modified(request, version)) is not None:
+        return cached
+    set_validators(response, version)
     return airline.get_airlines(db)
 
 
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException  # type: ignore
+from fastapi import APIRouter, Depends, HTTPException, Request, Response  # type: ignore
 from sqlalchemy.orm import Session
 from typing import List
 
+from app.api.conditional import not_modified, set_validators
 from app.db import schemas
-from app.crud import airport
+from app.crud import airport, change_tracker
 from app.db.session import SessionLocal
 
 router = APIRouter(prefix="/airports", tags=["airports"])
@@ -18,7 +19,11 @@ def get_db():
 
 
 @router.get("/", response_model=List[schemas.AirportOut])
-def read_airports(db: Session = Depends(get_db)):
+def read_airports(request: Request, response: Response, db: Session = Depends(get_db)):
+    version = change_tracker.table_version(db, change_tracker.AIRPORTS)
+    if (cached := not_modified(request, version)) is not None:
+        return cached
+    set_validators(response, version)
     return airport.get_airports(db)
 
 
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 
+from dateutil.relativedelta import relativedelta
+
+import orjson
+
+from app.api.conditional import not_modified, set_validators
+from app.api.pagination import Page, PageParams, set_next_page_headers
 from app.db import schemas, models
-from app.crud import flight
+from app.crud import change_tracker, flight
 from app.db.session import SessionLocal
-from app.services import booking_url_service
+from app.services import booking_url_service, search_cache
 
 
 router = APIRouter(prefix="/flights", tags=["flights"])
@@ -20,13 +26,58 @@ def get_db():
         db.close()
 
 
-def add_booking_url_to_flight(db_flight: models.Flight) -> str | None:
+def add_booking_url_to_flight(db_flight: models.Flight) -> schemas.FlightOut:
     flight_out = schemas.FlightOut.model_validate(db_flight)
-    return booking_url_service.generate_booking_url(db_flight)
+    flight_out.bookingUrl = booking_url_service.generate_booking_url(db_flight)
+    return flight_out
+
+
+def _flight_row_to_json(row) -> dict:
+    """A FLIGHT_LIST_COLUMNS row as the FlightOut JSON object, field for field."""
+    return {
+        "departureDate": row.departureDate,
+        "price": row.price,
+        "priceEur": row.priceEur,
+        "departureAirportCode": row.departureAirportCode,
+        "arrivalAirportCode": row.arrivalAirportCode,
+        "airlineCode": row.airlineCode,
+        "id": row.id,
+        "bookingUrl": booking_url_service.generate_booking_url_for(
+            row.airlineCode,
+            row.departureAirportCode,
+            row.arrivalAirportCode,
+            row.departureDate,
+        ),
+        "minPrice": row.minPriceEur,
+        "maxPrice": row.maxPriceEur,
+        "lastChangedAt": row.lastChangedAt,
+    }
+
+
+def _search_cache_key(
+    departure_airport_codes: Optional[List[str]],
+    arrival_airport_codes: Optional[List[str]],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    airline_codes: Optional[List[str]],
+    page: Page,
+) -> tuple:
+    """The search as filtered by the query, so reordered or repeated codes share an entry."""
+    return (
+        tuple(sorted(set(departure_airport_codes or ()))),
+        tuple(sorted(set(arrival_airport_codes or ()))),
+        start_date,
+        end_date,
+        tuple(sorted(set(airline_codes or ()))),
+        page.after,
+        page.limit,
+    )
 
 
 @router.get("/", response_model=List[schemas.FlightOut])
 def read_flights(
+    request: Request,
+    page: Page = Depends(PageParams((datetime, int))),
     db: Session = Depends(get_db),
     departureAirportCodes: Optional[List[str]] = Query(None),
     arrivalAirportCodes: Optional[List[str]] = Query(None),
@@ -34,29 +85,71 @@ def read_flights(
     endDate: Optional[date] = Query(None),
     airlineCodes: Optional[List[str]] = Query(None),
 ):
-    db_flights = flight.get_flights_with_min_max(
+    version = change_tracker.table_version(db, change_tracker.FLIGHTS)
+    if (unchanged := not_modified(request, version)) is not None:
+        return unchanged
+    cache_key = _search_cache_key(
+        departureAirportCodes,
+        arrivalAirportCodes,
+        startDate,
+        endDate,
+        airlineCodes,
+        page,
+    )
+    cached = search_cache.get(cache_key, version.number)
+    if cached is None:
+        rows, next_key = flight.get_flights_with_min_max(
+            db,
+            departure_airport_codes=departureAirportCodes,
+            arrival_airport_codes=arrivalAirportCodes,
+            start_date=startDate,
+            end_date=endDate,
+            airline_codes=airlineCodes,
+            after=page.after,
+            limit=page.limit,
+        )
+        # The rows come straight from typed columns, so they are encoded as-is
+        # rather than validated again through FlightOut; response_model only
+        # documents the shape.
+        cached = (orjson.dumps([_flight_row_to_json(row) for row in rows]), next_key)
+        search_cache.put(cache_key, cached, version.number)
+    content, next_key = cached
+    response = Response(content=content, media_type="application/json")
+    set_validators(response, version)
+    set_next_page_headers(request, response, next_key)
+    return response
+
+
+@router.get("/calendar", response_model=List[schemas.CalendarDayOut])
+def read_fare_calendar(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    departureAirportCodes: List[str] = Query(...),
+    arrivalAirportCodes: List[str] = Query(...),
+    month: str = Query(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$", examples=["2026-07"]),
+    airlineCodes: Optional[List[str]] = Query(None),
+):
+    """Cheapest priceEur of each day of `month` (YYYY-MM) over the given routes."""
+    version = change_tracker.table_version(db, change_tracker.FLIGHTS)
+    if (unchanged := not_modified(request, version)) is not None:
+        return unchanged
+    set_validators(response, version)
+    try:
+        start = datetime.strptime(month, "%Y-%m")
+        end = start + relativedelta(months=1)
+    except ValueError:
+        # The pattern admits year 0000, and 9999-12 has no following month.
+        raise HTTPException(status_code=422, detail="month is out of range")
+    return flight.get_cheapest_fares_by_day(
         db,
-        departure_airport_codes=departureAirportCodes,
-        arrival_airport_codes=arrivalAirportCodes,
-        start_date=startDate,
-        end_date=endDate,
+        departureAirportCodes,
+        arrivalAirportCodes,
+        start,
+        end,
         airline_codes=airlineCodes,
     )
 
-    return [
-        schemas.FlightOut(
-            **{
-                k: v
-                for k, v in schemas.FlightOut.from_orm(flight).dict().items()
-                if k not in ("minPrice", "maxPrice", "bookingUrl")
-            },
-            minPrice=min_price,
-            maxPrice=max_price,
-            bookingUrl=add_booking_url_to_flight(flight),
-        )
-        for flight, min_price, max_price in db_flights
-    ]
-
 
 @router.get("/{flight_id}", response_model=schemas.FlightOut)
 def read_flight(flight_id: int, db: Session = Depends(get_db)):
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException  # type: ignore
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response  # type: ignore
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal
 
+from app.api.conditional import not_modified, set_validators
+from app.api.pagination import Page, PageParams, set_next_page_headers
 from app.db import schemas
-from app.crud import flight_price_history
+from app.crud import change_tracker, flight_price_history
 from app.db.session import SessionLocal
 
 router = APIRouter(prefix="/price-history", tags=["flight price history"])
 
+SERIES_BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+# Fixed-width buckets are aligned on whole hours/days of the stored timestamps.
+SERIES_ALIGNED_ORIGIN = datetime(1970, 1, 1)
+DEFAULT_SERIES_POINTS = 100
+MAX_SERIES_POINTS = 1000
+
 
 def get_db():
     db = SessionLocal()
@@ -18,8 +28,51 @@ def get_db():
 
 
 @router.get("/flight/{flight_id}", response_model=List[schemas.FlightPriceHistoryOut])
-def read_price_history(flight_id: int, db: Session = Depends(get_db)):
-    return flight_price_history.get_price_history(db, flight_id)
+def read_price_history(
+    flight_id: int,
+    request: Request,
+    response: Response,
+    page: Page = Depends(PageParams((datetime, int))),
+    db: Session = Depends(get_db),
+):
+    version = change_tracker.flight_history_version(db, flight_id)
+    if (cached := not_modified(request, version)) is not None:
+        return cached
+    set_validators(response, version)
+    records, next_key = flight_price_history.get_price_history(
+        db, flight_id, after=page.after, limit=page.limit
+    )
+    set_next_page_headers(request, response, next_key)
+    return records
+
+
+@router.get("/flight/{flight_id}/series", response_model=List[schemas.PriceBucketOut])
+def read_price_series(
+    flight_id: int,
+    request: Request,
+    response: Response,
+    bucket: Literal["hour", "day", "auto"] = "auto",
+    points: int = Query(DEFAULT_SERIES_POINTS, ge=1, le=MAX_SERIES_POINTS),
+    db: Session = Depends(get_db),
+):
+    """
+    Open/low/high/close priceEur per hour, per day, or (auto) per bucket sized so
+    that the flight's whole history fits in at most `points` buckets.
+    """
+    version = change_tracker.flight_history_version(db, flight_id)
+    if (cached := not_modified(request, version)) is not None:
+        return cached
+    set_validators(response, version)
+    if bucket != "auto":
+        return flight_price_history.get_price_series(
+            db, flight_id, SERIES_BUCKET_SECONDS[bucket], SERIES_ALIGNED_ORIGIN
+        )
+    first, last = flight_price_history.get_price_history_span(db, flight_id)
+    if first is None:
+        return []
+    # floor(span / points) + 1 keeps span / width, hence the last bucket index, < points.
+    width = int((last - first).total_seconds()) // points + 1
+    return flight_price_history.get_price_series(db, flight_id, width, first)
 
 
 @router.get("/{record_id}", response_model=schemas.FlightPriceHistoryOut)
@@ -1,29 +1,21 @@
-import asyncio
+from typing import List
 
-from fastapi import APIRouter, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter
 
-from app.db.session import SessionLocal
-from app.services import scraper_service
+from app.db import schemas
+from app.services import scheduler_service
 
 router = APIRouter(prefix="/scraper", tags=["scraper"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+@router.get("/", status_code=202, response_model=schemas.ScrapeTriggerOut)
+async def scrape():
+    return {
+        "message": "Scraper jobs requested.",
+        "jobs": scheduler_service.trigger_scrape_jobs(),
+    }
 
 
-async def run_scrapers(db: Session):
-    await asyncio.gather(
-        scraper_service.run_nouvelair_job(db), scraper_service.run_tunisair_job(db)
-    )
-
-
-@router.get("/", status_code=202)
-async def scrape(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    background_tasks.add_task(run_scrapers, db)
-    return {"message": "Scraper jobs started in the background."}
+@router.get("/status", response_model=List[schemas.ScrapeJobStatus])
+async def scrape_status():
+    return scheduler_service.get_scheduler_status()
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query  # type: ignore
+from fastapi import (  # type: ignore
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.api.pagination import Page, PageParams, set_next_page_headers
 from app.db import schemas
 from app.crud import subscription
 from app.db.session import SessionLocal
+from app.services import subscription_index
 
 router = APIRouter(prefix="/subscriptions", tags=["subscriptions"])
 
@@ -19,11 +28,22 @@ def get_db():
 
 @router.get("/", response_model=List[schemas.SubscriptionOut])
 def read_subscriptions(
-    email: Optional[str] = Query(None), db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    email: Optional[str] = Query(None),
+    page: Page = Depends(PageParams((int,))),
+    db: Session = Depends(get_db),
 ):
     if email:
-        return subscription.get_subscriptions_by_email(db, email=email)
-    return subscription.get_subscriptions(db)
+        subscriptions, next_key = subscription.get_subscriptions_by_email(
+            db, email=email, after=page.after, limit=page.limit
+        )
+    else:
+        subscriptions, next_key = subscription.get_subscriptions(
+            db, after=page.after, limit=page.limit
+        )
+    set_next_page_headers(request, response, next_key)
+    return subscriptions
 
 
 @router.get("/{subscription_id}", response_model=schemas.SubscriptionOut)
@@ -50,7 +70,9 @@ def read_subscription_by_flight_and_email(
 
 @router.post("/", response_model=schemas.SubscriptionOut)
 def create_subscription(sub: schemas.SubscriptionCreate, db: Session = Depends(get_db)):
-    return subscription.create_subscription(db, sub)
+    created = subscription.create_subscription(db, sub)
+    subscription_index.sync(created)
+    return created
 
 
 @router.put("/{subscription_id}", response_model=schemas.SubscriptionOut)
@@ -62,6 +84,7 @@ def update_subscription(
     updated = subscription.update_subscription(db, subscription_id, sub_update)
     if not updated:
         raise HTTPException(status_code=404, detail="Subscription not found")
+    subscription_index.sync(updated)
     return updated
 
 
@@ -70,4 +93,5 @@ def delete_subscription(subscription_id: int, db: Session = Depends(get_db)):
     deleted = subscription.delete_subscription(db, subscription_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Subscription not found")
+    subscription_index.discard([subscription_id])
     return deleted
@@ -2,11 +2,14 @@ from fastapi import (  # type: ignore
     APIRouter,
     Depends,
     HTTPException,
+    Request,
+    Response,
     status,
 )
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.api.pagination import Page, PageParams, set_next_page_headers
 from app.db import schemas
 from app.crud import user
 from app.db.session import (
@@ -36,8 +39,14 @@ def create_user_endpoint(user_data: schemas.UserCreate, db: Session = Depends(ge
 
 
 @router.get("/", response_model=List[schemas.UserOut])
-def read_users_endpoint(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = user.get_users(db, skip=skip, limit=limit)
+def read_users_endpoint(
+    request: Request,
+    response: Response,
+    page: Page = Depends(PageParams((str,), default_limit=100)),
+    db: Session = Depends(get_db),
+):
+    users, next_key = user.get_users(db, after=page.after, limit=page.limit)
+    set_next_page_headers(request, response, next_key)
     return users
 
 
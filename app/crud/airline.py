@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from app.crud import change_tracker
 from app.db import models, schemas
 
 
@@ -13,6 +14,7 @@ def get_airlines(db: Session):
 def create_airline(db: Session, airline: schemas.AirlineCreate):
     db_airline = models.Airline(**airline.dict())
     db.add(db_airline)
+    change_tracker.mark_changed(db, change_tracker.AIRLINES)
     db.commit()
     db.refresh(db_airline)
     return db_airline
@@ -24,6 +26,7 @@ def update_airline(db: Session, code: str, airline_update: schemas.AirlineUpdate
         return None
     for key, value in airline_update.dict(exclude_unset=True).items():
         setattr(db_airline, key, value)
+    change_tracker.mark_changed(db, change_tracker.AIRLINES)
     db.commit()
     db.refresh(db_airline)
     return db_airline
@@ -34,5 +37,6 @@ def delete_airline(db: Session, code: str):
     if not db_airline:
         return None
     db.delete(db_airline)
+    change_tracker.mark_changed(db, change_tracker.AIRLINES)
     db.commit()
     return db_airline
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from app.crud import change_tracker
 from app.db import models, schemas
 
 
@@ -13,6 +14,7 @@ def get_airports(db: Session):
 def create_airport(db: Session, airport: schemas.AirportCreate):
     db_airport = models.Airport(**airport.dict())
     db.add(db_airport)
+    change_tracker.mark_changed(db, change_tracker.AIRPORTS)
     db.commit()
     db.refresh(db_airport)
     return db_airport
@@ -24,6 +26,7 @@ def update_airport(db: Session, code: str, airport: schemas.AirportCreate):
         return None
     for key, value in airport.dict().items():
         setattr(db_airport, key, value)
+    change_tracker.mark_changed(db, change_tracker.AIRPORTS)
     db.commit()
     db.refresh(db_airport)
     return db_airport
@@ -34,5 +37,6 @@ def delete_airport(db: Session, code: str):
     if not db_airport:
         return None
     db.delete(db_airport)
+    change_tracker.mark_changed(db, change_tracker.AIRPORTS)
     db.commit()
     return db_airport
@@ -0,0 +1,144 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    String,
+    Text,
+    column,
+    func,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.db import models
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+
+def enqueue_alerts(db: Session, rows: List[Dict[str, Any]]):
+    """
+    Adds alerts to the outbox without committing, so they land in the caller's
+    transaction. Rows whose idempotencyKey is already queued are ignored.
+    """
+    if not rows:
+        return
+    db.execute(
+        pg_insert(models.AlertOutbox)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["idempotencyKey"])
+    )
+
+
+def postpone_run(db: Session, run_id: str, next_attempt_at: datetime):
+    """
+    Moves the pending alerts queued by scrape run `run_id` to `next_attempt_at`
+    unless they are due later already, without committing.
+    """
+    db.execute(
+        update(models.AlertOutbox)
+        .where(models.AlertOutbox.runId == run_id)
+        .where(models.AlertOutbox.status == PENDING)
+        .where(models.AlertOutbox.nextAttemptAt < next_attempt_at)
+        .values(nextAttemptAt=next_attempt_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def claim_due_alerts(
+    db: Session,
+    limit: int,
+    now: datetime,
+    lease_until: datetime,
+    by_recipient: bool = False,
+):
+    """
+    Marks up to `limit` due alerts as sending until `lease_until` and commits.
+    With `by_recipient`, `limit` counts recipients instead and every due alert
+    of each is claimed, so none is left for a later batch.
+    FOR UPDATE SKIP LOCKED lets concurrent dispatchers claim disjoint batches; an
+    alert whose lease ran out (the dispatcher died mid-send) becomes due again.
+    Returns the alerts joined with their flight's route and departure date.
+    """
+    outbox = models.AlertOutbox
+    due = (
+        select(outbox.id)
+        .where(outbox.status.in_([PENDING, SENDING]))
+        .where(outbox.nextAttemptAt <= now)
+    )
+    if by_recipient:
+        due_emails = (
+            select(outbox.email)
+            .where(outbox.status.in_([PENDING, SENDING]))
+            .where(outbox.nextAttemptAt <= now)
+            .group_by(outbox.email)
+            .order_by(func.min(outbox.nextAttemptAt))
+            .limit(limit)
+        )
+        due = due.where(outbox.email.in_(due_emails))
+    else:
+        due = due.order_by(outbox.nextAttemptAt).limit(limit)
+    due_ids = due.with_for_update(skip_locked=True).scalar_subquery()
+    claimed = db.execute(
+        update(outbox)
+        .where(outbox.id.in_(due_ids))
+        .where(outbox.flightId == models.Flight.id)
+        .values(status=SENDING, attempts=outbox.attempts + 1, nextAttemptAt=lease_until)
+        .returning(
+            outbox.id,
+            outbox.idempotencyKey,
+            outbox.email,
+            outbox.targetPrice,
+            outbox.priceEur,
+            outbox.attempts,
+            models.Flight.departureDate,
+            models.Flight.departureAirportCode,
+            models.Flight.arrivalAirportCode,
+            models.Flight.airlineCode,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return claimed
+
+
+def mark_sent(db: Session, alert_ids: List[int], sent_at: datetime):
+    if not alert_ids:
+        return
+    db.execute(
+        update(models.AlertOutbox)
+        .where(models.AlertOutbox.id.in_(alert_ids))
+        .values(status=SENT, sentAt=sent_at, lastError=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def mark_failed(db: Session, failures: List[Tuple[int, str, datetime, str]]):
+    """Records (id, status, nextAttemptAt, lastError) for alerts that were not sent."""
+    if not failures:
+        return
+    outcomes = values(
+        column("id", Integer),
+        column("status", String),
+        column("nextAttemptAt", DateTime),
+        column("lastError", Text),
+        name="outcomes",
+    ).data(failures)
+    db.execute(
+        update(models.AlertOutbox)
+        .where(models.AlertOutbox.id == outcomes.c.id)
+        .values(
+            status=outcomes.c.status,
+            nextAttemptAt=outcomes.c.nextAttemptAt,
+            lastError=outcomes.c.lastError,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from typing import Iterable, NamedTuple, Set
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+FLIGHTS = "flights"
+AIRPORTS = "airports"
+AIRLINES = "airlines"
+
+_PENDING_TABLES = "changeTracker.tables"
+_PENDING_FLIGHTS = "changeTracker.flightHistories"
+
+
+class Version(NamedTuple):
+    number: int
+    modifiedAt: datetime
+
+
+# What a table or flight history reads as until a change to it is recorded.
+_UNCHANGED = Version(0, datetime(1970, 1, 1, tzinfo=timezone.utc))
+
+
+def _to_version(row) -> Version:
+    if row is None:
+        return _UNCHANGED
+    return Version(row.version, row.modifiedAt.replace(tzinfo=timezone.utc))
+
+
+def table_version(db: Session, table: str) -> Version:
+    return _to_version(
+        db.execute(
+            select(models.TableVersion.version, models.TableVersion.modifiedAt).where(
+                models.TableVersion.name == table
+            )
+        ).first()
+    )
+
+
+def flight_history_version(db: Session, flight_id: int) -> Version:
+    return _to_version(
+        db.execute(
+            select(
+                models.FlightHistoryVersion.version,
+                models.FlightHistoryVersion.modifiedAt,
+            ).where(models.FlightHistoryVersion.flightId == flight_id)
+        ).first()
+    )
+
+
+def mark_changed(db: Session, *tables: str, flight_histories: Iterable[int] = ()):
+    """
+    Records that the session's transaction writes `tables` and the price history
+    of `flight_histories`. Their versions are bumped in the same transaction just
+    before it commits, so a reader never gets a new version with the old data,
+    and not at all on rollback.
+    """
+    db.info.setdefault(_PENDING_TABLES, set()).update(tables)
+    db.info.setdefault(_PENDING_FLIGHTS, set()).update(flight_histories)
+
+
+def _bump(session: Session, model, key: str, keys: Iterable, now: datetime):
+    # Sorted, so concurrent commits lock shared version rows in the same order.
+    stmt = pg_insert(model).values(
+        [{key: k, "version": 1, "modifiedAt": now} for k in sorted(keys)]
+    )
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[key],
+            set_={
+                "version": model.version + 1,
+                "modifiedAt": stmt.excluded.modifiedAt,
+            },
+        )
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_pending(session: Session):
+    tables: Set[str] = session.info.pop(_PENDING_TABLES, set())
+    flight_ids: Set[int] = session.info.pop(_PENDING_FLIGHTS, set())
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if tables:
+        _bump(session, models.TableVersion, "name", tables, now)
+    if flight_ids:
+        _bump(session, models.FlightHistoryVersion, "flightId", flight_ids, now)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING_TABLES, None)
+    session.info.pop(_PENDING_FLIGHTS, None)
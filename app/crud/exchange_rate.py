@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.db import models
+
+
+def get_exchange_rate(
+    db: Session, base_currency: str, quote_currency: str
+) -> Optional[models.ExchangeRate]:
+    return (
+        db.query(models.ExchangeRate)
+        .filter(models.ExchangeRate.baseCurrency == base_currency)
+        .filter(models.ExchangeRate.quoteCurrency == quote_currency)
+        .first()
+    )
+
+
+def save_exchange_rates(
+    db: Session, base_currency: str, rates: Dict[str, float], fetched_at: datetime
+):
+    """Upserts every quote rate of `base_currency` in one statement."""
+    if not rates:
+        return
+    stmt = pg_insert(models.ExchangeRate).values(
+        [
+            {
+                "baseCurrency": base_currency,
+                "quoteCurrency": quote_currency,
+                "rate": rate,
+                "fetchedAt": fetched_at,
+            }
+            for quote_currency, rate in rates.items()
+        ]
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["baseCurrency", "quoteCurrency"],
+            set_={"rate": stmt.excluded.rate, "fetchedAt": stmt.excluded.fetchedAt},
+        )
+    )
+    db.commit()
@@ -1,13 +1,71 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import (
+    Float,
+    Integer,
+    column,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.crud import change_tracker
+from app.crud.pagination import SortKey, keyset_page
 from app.db import models, schemas
 
+BULK_CHUNK_SIZE = 1000
+PRICE_CHANGE_TOLERANCE = 0.01
+
+FlightNaturalKey = Tuple[Any, str, str, str]
+
+FLIGHT_LIST_COLUMNS = (
+    models.Flight.id,
+    models.Flight.departureDate,
+    models.Flight.price,
+    models.Flight.priceEur,
+    models.Flight.departureAirportCode,
+    models.Flight.arrivalAirportCode,
+    models.Flight.airlineCode,
+    models.Flight.minPriceEur,
+    models.Flight.maxPriceEur,
+    models.Flight.lastChangedAt,
+)
+
+
+def _chunks(items: Sequence, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
 
 def get_flight(db: Session, flight_id: int):
     return db.query(models.Flight).filter(models.Flight.id == flight_id).first()
 
 
-from sqlalchemy import func
+def get_flights_by_natural_keys(
+    db: Session, keys: Sequence[FlightNaturalKey]
+) -> List[models.Flight]:
+    """
+    Loads the flights matching the given
+    (departureDate, departureAirportCode, arrivalAirportCode, airlineCode) tuples
+    with one row-value IN query per chunk of keys.
+    """
+    natural_key = tuple_(
+        models.Flight.departureDate,
+        models.Flight.departureAirportCode,
+        models.Flight.arrivalAirportCode,
+        models.Flight.airlineCode,
+    )
+    flights: List[models.Flight] = []
+    for chunk in _chunks(list(keys)):
+        flights.extend(db.query(models.Flight).filter(natural_key.in_(chunk)).all())
+    return flights
 
 
 def get_flights_with_min_max(
@@ -17,20 +75,15 @@ def get_flights_with_min_max(
     start_date=None,
     end_date=None,
     airline_codes=None,
+    after: Optional[SortKey] = None,
+    limit: Optional[int] = None,
 ):
-    subq = (
-        db.query(
-            models.FlightPriceHistory.flightId.label("flight_id"),
-            func.min(models.FlightPriceHistory.priceEur).label("min_price"),
-            func.max(models.FlightPriceHistory.priceEur).label("max_price"),
-        )
-        .group_by(models.FlightPriceHistory.flightId)
-        .subquery()
-    )
-
-    q = db.query(models.Flight, subq.c.min_price, subq.c.max_price).outerjoin(
-        subq, models.Flight.id == subq.c.flight_id
-    )
+    """
+    Flights matching the filters as plain rows of FLIGHT_LIST_COLUMNS, ordered by
+    (departureDate, id), so no ORM objects are built for a search. Returns one
+    keyset page and the key of the next one.
+    """
+    q = db.query(*FLIGHT_LIST_COLUMNS)
 
     if departure_airport_codes:
         q = q.filter(models.Flight.departureAirportCode.in_(departure_airport_codes))
@@ -43,17 +96,202 @@ def get_flights_with_min_max(
     if airline_codes:
         q = q.filter(models.Flight.airlineCode.in_(airline_codes))
 
-    return q.all()
+    return keyset_page(
+        q,
+        (models.Flight.departureDate, models.Flight.id),
+        lambda row: (row.departureDate, row.id),
+        after,
+        limit,
+    )
+
+
+def get_cheapest_fares_by_day(
+    db: Session,
+    departure_airport_codes: Sequence[str],
+    arrival_airport_codes: Sequence[str],
+    start: datetime,
+    end: datetime,
+    airline_codes: Optional[Sequence[str]] = None,
+):
+    """
+    The cheapest flight (by priceEur, then id) of each day in [start, end) across
+    the given routes and airlines, one row per day with flights, in day order.
+    """
+    day = func.date(models.Flight.departureDate).label("day")
+    q = db.query(
+        day,
+        models.Flight.priceEur,
+        models.Flight.id.label("flightId"),
+        models.Flight.airlineCode,
+        models.Flight.departureAirportCode,
+        models.Flight.arrivalAirportCode,
+    ).filter(
+        models.Flight.departureAirportCode.in_(departure_airport_codes),
+        models.Flight.arrivalAirportCode.in_(arrival_airport_codes),
+        models.Flight.departureDate >= start,
+        models.Flight.departureDate < end,
+    )
+    if airline_codes:
+        q = q.filter(models.Flight.airlineCode.in_(airline_codes))
+    return q.distinct(day).order_by(day, models.Flight.priceEur, models.Flight.id).all()
 
 
 def create_flight(db: Session, flight: schemas.FlightCreate) -> models.Flight:
     db_flight: models.Flight = models.Flight(**flight.model_dump())
     db.add(db_flight)
+    change_tracker.mark_changed(db, change_tracker.FLIGHTS)
     db.commit()
     db.refresh(db_flight)
     return db_flight
 
 
+def bulk_create_flights(db: Session, rows: List[Dict[str, Any]]):
+    """
+    Inserts the given flight rows in batched INSERT statements without committing.
+    Returns the id and prices of every inserted row.
+    """
+    created = []
+    for chunk in _chunks(rows):
+        created.extend(
+            db.execute(
+                insert(models.Flight).returning(
+                    models.Flight.id, models.Flight.price, models.Flight.priceEur
+                ),
+                chunk,
+            ).all()
+        )
+    if created:
+        change_tracker.mark_changed(db, change_tracker.FLIGHTS)
+    return created
+
+
+def upsert_flights(db: Session, rows: List[Dict[str, Any]]):
+    """
+    Postgres INSERT ... ON CONFLICT DO UPDATE on the flight natural key, without
+    committing. Rows whose price did not change are left untouched and are not
+    returned; every returned row carries an `inserted` flag and the pre-statement
+    `oldPriceEur` (NULL for inserted rows). Rows must have unique natural keys
+    and carry the initial minPriceEur/maxPriceEur/lastChangedAt; on update, the
+    stats fold in the new price the way bulk_update_flight_prices does.
+    """
+    flights = models.Flight.__table__
+    previous = flights.alias("previous")
+    upserted = []
+    for chunk in _chunks(rows):
+        stmt = pg_insert(flights).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                flights.c.departureDate,
+                flights.c.departureAirportCode,
+                flights.c.arrivalAirportCode,
+                flights.c.airlineCode,
+            ],
+            set_={
+                "price": stmt.excluded.price,
+                "priceEur": stmt.excluded.priceEur,
+                **_price_stats_on_change(
+                    stmt.excluded.priceEur, stmt.excluded.lastChangedAt
+                ),
+            },
+            where=func.abs(flights.c.price - stmt.excluded.price)
+            > PRICE_CHANGE_TOLERANCE,
+        ).returning(
+            flights.c.id,
+            flights.c.price,
+            flights.c.priceEur,
+            literal_column("xmax = 0").label("inserted"),
+            # Sub-selects see the snapshot taken before the upsert ran.
+            select(previous.c.priceEur)
+            .where(previous.c.id == literal_column("flights.id"))
+            .scalar_subquery()
+            .label("oldPriceEur"),
+        )
+        upserted.extend(db.execute(stmt).all())
+    if upserted:
+        change_tracker.mark_changed(db, change_tracker.FLIGHTS)
+    return upserted
+
+
+def _price_stats_on_change(new_price_eur, changed_at):
+    """Column values that fold a newly recorded price into the flight's stats."""
+    return {
+        "minPriceEur": func.least(models.Flight.minPriceEur, new_price_eur),
+        "maxPriceEur": func.greatest(models.Flight.maxPriceEur, new_price_eur),
+        "lastChangedAt": changed_at,
+    }
+
+
+def bulk_update_flight_prices(
+    db: Session, price_updates: List[Dict[str, Any]], changed_at: datetime
+):
+    """
+    Applies {"id", "price", "priceEur"} updates with one UPDATE ... FROM (VALUES ...)
+    statement per chunk, without committing. The min/max price stats take the new
+    price into account and lastChangedAt is set to `changed_at`.
+    """
+    for chunk in _chunks(price_updates):
+        new_prices = values(
+            column("id", Integer),
+            column("price", Float),
+            column("priceEur", Float),
+            name="new_prices",
+        ).data([(u["id"], u["price"], u["priceEur"]) for u in chunk])
+        db.execute(
+            update(models.Flight)
+            .where(models.Flight.id == new_prices.c.id)
+            .values(
+                price=new_prices.c.price,
+                priceEur=new_prices.c.priceEur,
+                **_price_stats_on_change(new_prices.c.priceEur, changed_at),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    if price_updates:
+        change_tracker.mark_changed(db, change_tracker.FLIGHTS)
+
+
+def reconcile_price_stats(db: Session, flight_ids: Optional[Sequence[int]] = None):
+    """
+    Recomputes minPriceEur/maxPriceEur/lastChangedAt from flightPriceHistory for
+    the given flights (all when None), without committing. Only rows that drifted
+    are written; returns how many were.
+    """
+    history = models.FlightPriceHistory
+    stats = (
+        select(
+            models.Flight.id.label("flightId"),
+            func.min(history.priceEur).label("minPriceEur"),
+            func.max(history.priceEur).label("maxPriceEur"),
+            func.max(history.timestamp).label("lastChangedAt"),
+        )
+        .outerjoin(history, history.flightId == models.Flight.id)
+        .group_by(models.Flight.id)
+    )
+    if flight_ids is not None:
+        stats = stats.where(models.Flight.id.in_(flight_ids))
+    stats = stats.subquery("stats")
+    result = db.execute(
+        update(models.Flight)
+        .where(models.Flight.id == stats.c.flightId)
+        .where(
+            or_(
+                models.Flight.minPriceEur.is_distinct_from(stats.c.minPriceEur),
+                models.Flight.maxPriceEur.is_distinct_from(stats.c.maxPriceEur),
+                models.Flight.lastChangedAt.is_distinct_from(stats.c.lastChangedAt),
+            )
+        )
+        .values(
+            minPriceEur=stats.c.minPriceEur,
+            maxPriceEur=stats.c.maxPriceEur,
+            lastChangedAt=stats.c.lastChangedAt,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        change_tracker.mark_changed(db, change_tracker.FLIGHTS)
+    return result.rowcount
+
+
 def update_flight(db: Session, flight_id: int, flight_update: schemas.FlightUpdate):
     db_flight = get_flight(db, flight_id)
     if not db_flight:
@@ -61,6 +299,7 @@ def update_flight(db: Session, flight_id: int, flight_update: schemas.FlightUpda
     update_data = flight_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_flight, key, value)
+    change_tracker.mark_changed(db, change_tracker.FLIGHTS)
     db.commit()
     db.refresh(db_flight)
     return db_flight
@@ -71,5 +310,8 @@ def delete_flight(db: Session, flight_id: int):
     if not db_flight:
         return None
     db.delete(db_flight)
+    change_tracker.mark_changed(
+        db, change_tracker.FLIGHTS, flight_histories=[flight_id]
+    )
     db.commit()
     return db_flight
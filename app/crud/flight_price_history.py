@@ -1,25 +1,118 @@
-from sqlalchemy import func
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, func, insert, literal, select, type_coerce
 from sqlalchemy.orm import Session
+from app.crud import change_tracker, flight
+from app.crud.pagination import SortKey, keyset_page
 from app.db import models, schemas
 
 
-def get_price_history(db: Session, flight_id: int):
+def get_price_history(
+    db: Session,
+    flight_id: int,
+    after: Optional[SortKey] = None,
+    limit: Optional[int] = None,
+):
+    """Newest first, by (timestamp, id); returns one keyset page and the next key."""
+    return keyset_page(
+        db.query(models.FlightPriceHistory).filter(
+            models.FlightPriceHistory.flightId == flight_id
+        ),
+        (models.FlightPriceHistory.timestamp, models.FlightPriceHistory.id),
+        lambda record: (record.timestamp, record.id),
+        after,
+        limit,
+        descending=True,
+    )
+
+
+def get_price_history_span(
+    db: Session, flight_id: int
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Timestamps of the flight's first and last history rows (None, None without any)."""
+    history = models.FlightPriceHistory
     return (
-        db.query(models.FlightPriceHistory)
-        .filter(models.FlightPriceHistory.flightId == flight_id)
-        .order_by(models.FlightPriceHistory.timestamp.desc())
-        .all()
+        db.query(func.min(history.timestamp), func.max(history.timestamp))
+        .filter(history.flightId == flight_id)
+        .one()
     )
 
 
+def get_price_series(
+    db: Session, flight_id: int, bucket_seconds: int, origin: datetime
+):
+    """
+    The flight's priceEur history downsampled into `bucket_seconds`-wide buckets
+    counted from `origin`, oldest first: per bucket its start, the first (open)
+    and last (close) price by (timestamp, id), the low, the high and the number
+    of rows. Open/close come from window functions over each bucket, the rest
+    from the GROUP BY that collapses it to one row.
+    """
+    history = models.FlightPriceHistory
+    elapsed_seconds = func.extract("epoch", history.timestamp - origin)
+    bucket_start = type_coerce(
+        literal(origin, DateTime)
+        + func.make_interval(
+            0,
+            0,
+            0,
+            0,
+            0,
+            0,
+            func.floor(elapsed_seconds / bucket_seconds) * bucket_seconds,
+        ),
+        DateTime,
+    ).label("bucketStart")
+    in_bucket_order = {
+        "partition_by": bucket_start,
+        "order_by": (history.timestamp, history.id),
+        "rows": (None, None),
+    }
+    rows = (
+        select(
+            bucket_start,
+            history.priceEur,
+            func.first_value(history.priceEur).over(**in_bucket_order).label("open"),
+            func.last_value(history.priceEur).over(**in_bucket_order).label("close"),
+        )
+        .where(history.flightId == flight_id)
+        .subquery("rows")
+    )
+    return db.execute(
+        select(
+            rows.c.bucketStart,
+            func.min(rows.c.open).label("open"),
+            func.min(rows.c.priceEur).label("low"),
+            func.max(rows.c.priceEur).label("high"),
+            func.min(rows.c.close).label("close"),
+            func.count().label("count"),
+        )
+        .group_by(rows.c.bucketStart)
+        .order_by(rows.c.bucketStart)
+    ).all()
+
+
 def create_price_history(db: Session, price_history: schemas.FlightPriceHistoryCreate):
     db_record = models.FlightPriceHistory(**price_history.model_dump())
     db.add(db_record)
+    db.flush()
+    flight.reconcile_price_stats(db, [db_record.flightId])
+    change_tracker.mark_changed(db, flight_histories=[db_record.flightId])
     db.commit()
     db.refresh(db_record)
     return db_record
 
 
+def bulk_create_price_history(db: Session, rows: List[Dict[str, Any]]):
+    """Inserts the given history rows in one batched INSERT, without committing."""
+    if rows:
+        db.execute(insert(models.FlightPriceHistory), rows)
+        change_tracker.mark_changed(
+            db, flight_histories={row["flightId"] for row in rows}
+        )
+
+
 def get_price_history_by_id(db: Session, record_id: int):
     return (
         db.query(models.FlightPriceHistory)
@@ -33,5 +126,8 @@ def delete_price_history(db: Session, record_id: int):
     if not record:
         return None
     db.delete(record)
+    db.flush()
+    flight.reconcile_price_stats(db, [record.flightId])
+    change_tracker.mark_changed(db, flight_histories=[record.flightId])
     db.commit()
     return record
@@ -0,0 +1,35 @@
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+SortKey = Tuple[Any, ...]
+
+
+def keyset_page(
+    query: Query,
+    sort_columns: Sequence[Any],
+    key_of: Callable[[Any], SortKey],
+    after: Optional[SortKey] = None,
+    limit: Optional[int] = None,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[SortKey]]:
+    """
+    Orders `query` by `sort_columns`, whose last column must be unique, and
+    returns the `limit` rows that follow the `after` key together with the key
+    to pass as `after` for the next page (None on the last page). The row-value
+    comparison lets the database seek straight to the page on an index over
+    the sort columns, however deep it is.
+    """
+    if after is not None:
+        sort_key = tuple_(*sort_columns)
+        query = query.filter(sort_key < after if descending else sort_key > after)
+    query = query.order_by(
+        *(column.desc() if descending else column.asc() for column in sort_columns)
+    )
+    if limit is None:
+        return query.all(), None
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], key_of(rows[limit - 1])
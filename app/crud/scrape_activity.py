@@ -0,0 +1,60 @@
+from datetime import date, datetime
+from typing import Dict, NamedTuple, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.db import models
+
+RouteMonth = Tuple[str, str, str]
+
+
+class SliceActivity(NamedTuple):
+    priceChanges: int = 0
+    activeSubscriptions: int = 0
+
+
+def _route_month_columns():
+    return (
+        models.Flight.departureAirportCode,
+        models.Flight.arrivalAirportCode,
+        func.to_char(models.Flight.departureDate, "YYYY-MM"),
+    )
+
+
+def get_slice_activity(
+    db: Session, airline_code: str, since: datetime
+) -> Dict[RouteMonth, SliceActivity]:
+    """
+    Per (departure, arrival, "YYYY-MM") of the airline's upcoming flights: price
+    history rows recorded since `since` and active subscriptions.
+    """
+    group = _route_month_columns()
+    upcoming = (
+        models.Flight.airlineCode == airline_code,
+        models.Flight.departureDate >= date.today(),
+    )
+    price_changes = (
+        db.query(*group, func.count(models.FlightPriceHistory.id))
+        .join(
+            models.FlightPriceHistory,
+            models.FlightPriceHistory.flightId == models.Flight.id,
+        )
+        .filter(*upcoming, models.FlightPriceHistory.timestamp >= since)
+        .group_by(*group)
+        .all()
+    )
+    subscriptions = (
+        db.query(*group, func.count(models.Subscription.id))
+        .join(models.Subscription, models.Subscription.flightId == models.Flight.id)
+        .filter(*upcoming, models.Subscription.isActive == True)
+        .group_by(*group)
+        .all()
+    )
+    activity: Dict[RouteMonth, SliceActivity] = {}
+    for dep, arr, month, count in price_changes:
+        activity[(dep, arr, month)] = SliceActivity(priceChanges=count)
+    for dep, arr, month, count in subscriptions:
+        activity[(dep, arr, month)] = activity.get(
+            (dep, arr, month), SliceActivity()
+        )._replace(activeSubscriptions=count)
+    return activity
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.db import models
+
+SliceKey = Tuple[str, str, str, str]
+
+
+def _slice_key_columns():
+    return tuple_(
+        models.ScrapeDigest.airlineCode,
+        models.ScrapeDigest.departureAirportCode,
+        models.ScrapeDigest.arrivalAirportCode,
+        models.ScrapeDigest.searchMonth,
+    )
+
+
+def get_digests(db: Session, airline_code: str) -> Dict[SliceKey, models.ScrapeDigest]:
+    return {
+        (d.airlineCode, d.departureAirportCode, d.arrivalAirportCode, d.searchMonth): d
+        for d in db.query(models.ScrapeDigest)
+        .filter(models.ScrapeDigest.airlineCode == airline_code)
+        .all()
+    }
+
+
+def save_digests(db: Session, digests: List[Tuple[SliceKey, str]], now: datetime):
+    """Upserts the digests of slices that were just parsed and ingested."""
+    if not digests:
+        return
+    stmt = pg_insert(models.ScrapeDigest).values(
+        [
+            {
+                "airlineCode": key[0],
+                "departureAirportCode": key[1],
+                "arrivalAirportCode": key[2],
+                "searchMonth": key[3],
+                "digest": digest,
+                "processedAt": now,
+                "checkedAt": now,
+            }
+            for key, digest in digests
+        ]
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[
+                "airlineCode",
+                "departureAirportCode",
+                "arrivalAirportCode",
+                "searchMonth",
+            ],
+            set_={
+                "digest": stmt.excluded.digest,
+                "processedAt": stmt.excluded.processedAt,
+                "checkedAt": stmt.excluded.checkedAt,
+            },
+        )
+    )
+    db.commit()
+
+
+def touch_digests(db: Session, keys: List[SliceKey], now: datetime):
+    """Records that unchanged slices were fetched again at `now`."""
+    if not keys:
+        return
+    db.execute(
+        update(models.ScrapeDigest)
+        .where(_slice_key_columns().in_(keys))
+        .values(checkedAt=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
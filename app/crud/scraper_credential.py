@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from app.db import models
+
+
+def get_credential(db: Session, name: str) -> Optional[models.ScraperCredential]:
+    return (
+        db.query(models.ScraperCredential)
+        .filter(models.ScraperCredential.name == name)
+        .first()
+    )
+
+
+def save_credential(db: Session, name: str, value: str) -> models.ScraperCredential:
+    db_credential = get_credential(db, name)
+    if not db_credential:
+        db_credential = models.ScraperCredential(name=name)
+        db.add(db_credential)
+    db_credential.value = value  # type: ignore
+    db_credential.fetchedAt = datetime.now()  # type: ignore
+    db.commit()
+    db.refresh(db_credential)
+    return db_credential
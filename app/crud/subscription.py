@@ -1,11 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Float, Integer, column, select, update, values
 from sqlalchemy.orm import Session
+from app.crud.pagination import SortKey, keyset_page
 from app.db import models, schemas
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
 
 
-def get_subscriptions_by_email(db: Session, email: str) -> List[models.Subscription]:
-    return (
-        db.query(models.Subscription).filter(models.Subscription.email == email).all()
+def _subscriptions_page(query, after: Optional[SortKey], limit: Optional[int]):
+    return keyset_page(
+        query, (models.Subscription.id,), lambda sub: (sub.id,), after, limit
+    )
+
+
+def get_subscriptions_by_email(
+    db: Session,
+    email: str,
+    after: Optional[SortKey] = None,
+    limit: Optional[int] = None,
+):
+    return _subscriptions_page(
+        db.query(models.Subscription).filter(models.Subscription.email == email),
+        after,
+        limit,
     )
 
 
@@ -30,9 +46,13 @@ def get_subscription(
     )
 
 
-def get_subscriptions(db: Session) -> List[models.Subscription]:
-    return (
-        db.query(models.Subscription).filter(models.Subscription.isActive == True).all()
+def get_subscriptions(
+    db: Session, after: Optional[SortKey] = None, limit: Optional[int] = None
+):
+    return _subscriptions_page(
+        db.query(models.Subscription).filter(models.Subscription.isActive == True),
+        after,
+        limit,
     )
 
 
@@ -53,6 +73,86 @@ def get_active_subscriptions_for_flight_with_notifications_enabled(
     )
 
 
+def get_triggered_subscriptions(
+    db: Session, price_changes: Sequence[Tuple[int, float, float]]
+):
+    """
+    Given (flightId, oldPriceEur, newPriceEur) changes, returns in one query the
+    active subscriptions of users with notifications enabled whose target price
+    was crossed, as (Subscription, newPriceEur) rows.
+    """
+    if not price_changes:
+        return []
+    changes = values(
+        column("flightId", Integer),
+        column("oldPriceEur", Float),
+        column("newPriceEur", Float),
+        name="price_changes",
+    ).data(list(price_changes))
+    return (
+        db.query(models.Subscription, changes.c.newPriceEur)
+        .join(changes, models.Subscription.flightId == changes.c.flightId)
+        .join(models.User, models.Subscription.email == models.User.email)
+        .filter(models.Subscription.isActive == True)
+        .filter(models.User.enableNotificationsSetting == True)
+        .filter(changes.c.oldPriceEur > models.Subscription.targetPrice)
+        .filter(changes.c.newPriceEur <= models.Subscription.targetPrice)
+        .all()
+    )
+
+
+def get_flights_with_subscriptions_written_since(
+    db: Session, since: datetime, flight_ids: Iterable[int]
+) -> Set[int]:
+    """The given flights that have a subscription written at or after `since`."""
+    flight_ids = list(flight_ids)
+    if not flight_ids:
+        return set()
+    return set(
+        db.execute(
+            select(models.Subscription.flightId)
+            .where(models.Subscription.updatedAt >= since)
+            .where(models.Subscription.flightId.in_(flight_ids))
+            .distinct()
+        ).scalars()
+    )
+
+
+def get_notifiable_subscriptions(
+    db: Session, subscription_ids: Sequence[int]
+) -> List[models.Subscription]:
+    """Loads the given subscriptions that are active and whose user has notifications on."""
+    if not subscription_ids:
+        return []
+    return (
+        db.query(models.Subscription)
+        .join(models.User, models.Subscription.email == models.User.email)
+        .filter(models.Subscription.id.in_(subscription_ids))
+        .filter(models.Subscription.isActive == True)
+        .filter(models.User.enableNotificationsSetting == True)
+        .all()
+    )
+
+
+def deactivate_subscriptions(db: Session, subscription_ids: List[int]) -> List[int]:
+    """
+    Deactivates the given subscriptions in one UPDATE, without committing, and
+    returns the ids that were still active, i.e. the ones this call claimed.
+    """
+    if not subscription_ids:
+        return []
+    return list(
+        db.execute(
+            update(models.Subscription)
+            .where(models.Subscription.id.in_(subscription_ids))
+            .where(models.Subscription.isActive == True)
+            .values(isActive=False)
+            .returning(models.Subscription.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+
+
 def create_subscription(
     db: Session, subscription: schemas.SubscriptionCreate
 ) -> models.Subscription:
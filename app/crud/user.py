@@ -1,14 +1,18 @@
 from sqlalchemy.orm import Session
+from app.crud.pagination import SortKey, keyset_page
 from app.db import models, schemas
-from typing import Optional, List
+from typing import Optional
 
 
 def get_user(db: Session, email: str) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.email == email).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, after: Optional[SortKey] = None, limit: int = 100):
+    """Users by email, one keyset page after `after`, with the next page's key."""
+    return keyset_page(
+        db.query(models.User), (models.User.email,), lambda u: (u.email,), after, limit
+    )
 
 
 def create_user(db: Session, user: schemas.UserCreate) -> models.User:
@@ -0,0 +1,41 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "4"))
+
+db_executor = ThreadPoolExecutor(
+    max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db-worker"
+)
+
+
+def _run_with_session(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    # Imported here so modules built on run_db (the scraper's pure parsing
+    # helpers included) import without a configured database.
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs the blocking `fn(db, *args, **kwargs)` on the DB thread pool with a
+    session of its own, closed (and rolled back if uncommitted) afterwards, so
+    background jobs never block the event loop on SQLAlchemy calls.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        db_executor, partial(_run_with_session, fn, *args, **kwargs)
+    )
+
+
+def shutdown_db_executor():
+    db_executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,95 @@
+import logging
+import time
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+MIGRATIONS_LOCK_ID = 7_201_001
+MIGRATIONS_LOCK_POLL_SECONDS = 1.0
+# First line of a migration that must run outside a transaction, such as
+# CREATE INDEX CONCURRENTLY. Its "--" comment lines are dropped, the rest is
+# split on ";" and each statement commits on its own, so write them to be safe
+# to re-run (IF [NOT] EXISTS).
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+
+
+def _acquire_lock(connection: Connection):
+    # Polls instead of blocking in pg_advisory_lock: a waiting worker would hold a
+    # snapshot that CREATE INDEX CONCURRENTLY in the lock holder has to wait out.
+    while not connection.execute(
+        text("SELECT pg_try_advisory_lock(:lock_id)"),
+        {"lock_id": MIGRATIONS_LOCK_ID},
+    ).scalar():
+        time.sleep(MIGRATIONS_LOCK_POLL_SECONDS)
+
+
+def _statements(sql: str) -> List[str]:
+    code = "\n".join(
+        line for line in sql.splitlines() if not line.lstrip().startswith("--")
+    )
+    return [statement for statement in code.split(";") if statement.strip()]
+
+
+def _record(connection: Connection, version: str):
+    connection.execute(
+        text('INSERT INTO "schemaMigrations" (version) VALUES (:version)'),
+        {"version": version},
+    )
+
+
+def apply_migrations(engine: Engine):
+    """
+    Applies the versioned SQL files in app/db/migrations that are not yet recorded
+    in "schemaMigrations", in file-name order, each in its own transaction unless
+    it starts with NO_TRANSACTION_MARKER. An advisory lock keeps concurrently
+    starting workers from racing each other.
+    """
+    with engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as lock_connection:
+        _acquire_lock(lock_connection)
+        try:
+            lock_connection.execute(
+                text(
+                    'CREATE TABLE IF NOT EXISTS "schemaMigrations" ('
+                    "version VARCHAR(100) PRIMARY KEY, "
+                    '"appliedAt" TIMESTAMP NOT NULL DEFAULT now())'
+                )
+            )
+            applied = set(
+                lock_connection.execute(
+                    text('SELECT version FROM "schemaMigrations"')
+                ).scalars()
+            )
+            for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+                version = path.stem
+                if version in applied:
+                    continue
+                logger.info(f"Applying database migration {version}...")
+                sql = path.read_text()
+                if sql.startswith(NO_TRANSACTION_MARKER):
+                    for statement in _statements(sql):
+                        lock_connection.exec_driver_sql(statement)
+                    _record(lock_connection, version)
+                else:
+                    with engine.begin() as connection:
+                        connection.exec_driver_sql(sql)
+                        _record(connection, version)
+        finally:
+            lock_connection.execute(
+                text("SELECT pg_advisory_unlock(:lock_id)"),
+                {"lock_id": MIGRATIONS_LOCK_ID},
+            )
+    logger.info("✅ Database schema is up to date.")
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    logging.basicConfig(level=logging.INFO)
+    apply_migrations(engine)
@@ -0,0 +1,28 @@
+-- A flight is identified by (departureDate, departureAirportCode, arrivalAirportCode, airlineCode).
+-- Collapse existing duplicates onto the lowest id before enforcing that key.
+CREATE TEMPORARY TABLE flight_duplicates ON COMMIT DROP AS
+SELECT
+    id,
+    min(id) OVER (
+        PARTITION BY "departureDate", "departureAirportCode", "arrivalAirportCode", "airlineCode"
+    ) AS keep_id
+FROM flights;
+
+DELETE FROM flight_duplicates WHERE id = keep_id;
+
+UPDATE "flightPriceHistory" h
+SET "flightId" = d.keep_id
+FROM flight_duplicates d
+WHERE h."flightId" = d.id;
+
+UPDATE subscriptions s
+SET "flightId" = d.keep_id
+FROM flight_duplicates d
+WHERE s."flightId" = d.id;
+
+DELETE FROM flights f
+USING flight_duplicates d
+WHERE f.id = d.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_flights_natural_key
+    ON flights ("departureDate", "departureAirportCode", "arrivalAirportCode", "airlineCode");
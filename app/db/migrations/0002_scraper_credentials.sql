@@ -0,0 +1,6 @@
+-- Cache for secrets the scrapers have to capture from airline websites (e.g. the Nouvelair x-api-key).
+CREATE TABLE IF NOT EXISTS "scraperCredentials" (
+    name VARCHAR(50) PRIMARY KEY,
+    value VARCHAR(255) NOT NULL,
+    "fetchedAt" TIMESTAMP NOT NULL
+);
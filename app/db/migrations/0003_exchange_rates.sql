@@ -0,0 +1,8 @@
+-- Last known exchange rates, shared by every scraper that converts prices.
+CREATE TABLE IF NOT EXISTS "exchangeRates" (
+    "baseCurrency" VARCHAR(3) NOT NULL,
+    "quoteCurrency" VARCHAR(3) NOT NULL,
+    rate DOUBLE PRECISION NOT NULL,
+    "fetchedAt" TIMESTAMP NOT NULL,
+    PRIMARY KEY ("baseCurrency", "quoteCurrency")
+);
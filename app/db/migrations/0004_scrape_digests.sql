@@ -0,0 +1,12 @@
+-- Digest of the last upstream response per scraped slice (airline, route, search month),
+-- used to skip parsing and ingesting responses that did not change.
+CREATE TABLE IF NOT EXISTS "scrapeDigests" (
+    "airlineCode" VARCHAR(10) NOT NULL,
+    "departureAirportCode" VARCHAR(10) NOT NULL,
+    "arrivalAirportCode" VARCHAR(10) NOT NULL,
+    "searchMonth" VARCHAR(7) NOT NULL,
+    digest VARCHAR(64) NOT NULL,
+    "processedAt" TIMESTAMP NOT NULL,
+    "checkedAt" TIMESTAMP NOT NULL,
+    PRIMARY KEY ("airlineCode", "departureAirportCode", "arrivalAirportCode", "searchMonth")
+);
@@ -0,0 +1,21 @@
+-- Price alerts waiting for delivery, written in the same transaction as the price
+-- change that triggered them and drained by the alert dispatcher.
+CREATE TABLE IF NOT EXISTS "alertOutbox" (
+    id SERIAL PRIMARY KEY,
+    "idempotencyKey" VARCHAR(100) NOT NULL UNIQUE,
+    "subscriptionId" INTEGER NOT NULL REFERENCES subscriptions(id) ON DELETE CASCADE,
+    "flightId" INTEGER NOT NULL REFERENCES flights(id) ON DELETE CASCADE,
+    email VARCHAR(100) NOT NULL,
+    "targetPrice" DOUBLE PRECISION NOT NULL,
+    "priceEur" DOUBLE PRECISION NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    "nextAttemptAt" TIMESTAMP NOT NULL,
+    "createdAt" TIMESTAMP NOT NULL,
+    "sentAt" TIMESTAMP,
+    "lastError" TEXT
+);
+
+CREATE INDEX IF NOT EXISTS "ix_alertOutbox_due"
+    ON "alertOutbox" ("nextAttemptAt")
+    WHERE status IN ('pending', 'sending');
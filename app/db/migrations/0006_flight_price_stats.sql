@@ -0,0 +1,19 @@
+-- Lowest/highest recorded EUR price and time of the last recorded price per flight,
+-- kept up to date at ingest so flight searches no longer aggregate the history table.
+ALTER TABLE flights ADD COLUMN IF NOT EXISTS "minPriceEur" DOUBLE PRECISION;
+ALTER TABLE flights ADD COLUMN IF NOT EXISTS "maxPriceEur" DOUBLE PRECISION;
+ALTER TABLE flights ADD COLUMN IF NOT EXISTS "lastChangedAt" TIMESTAMP;
+
+UPDATE flights
+SET "minPriceEur" = stats."minPriceEur",
+    "maxPriceEur" = stats."maxPriceEur",
+    "lastChangedAt" = stats."lastChangedAt"
+FROM (
+    SELECT "flightId",
+           MIN("priceEur") AS "minPriceEur",
+           MAX("priceEur") AS "maxPriceEur",
+           MAX(timestamp) AS "lastChangedAt"
+    FROM "flightPriceHistory"
+    GROUP BY "flightId"
+) AS stats
+WHERE flights.id = stats."flightId";
@@ -0,0 +1,33 @@
+-- migrate: no-transaction
+-- Composite and partial indexes shaped after the hot queries. Each replaces a
+-- single-column index that is a prefix of it, so the old one is dropped once
+-- the new one is in place.
+-- Check with: python -m app.services.maintenance check-query-plans
+--
+-- Built CONCURRENTLY so ingests and alert writes keep going on populated tables;
+-- startup still waits for the builds. An interrupted build leaves an INVALID
+-- index behind, so each one is dropped first and rebuilt when this re-runs.
+
+-- Flight listing by date: range on "departureDate", keyset order (departureDate, id).
+DROP INDEX CONCURRENTLY IF EXISTS "ix_flights_departureDate_id";
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_flights_departureDate_id"
+    ON flights ("departureDate", id);
+DROP INDEX CONCURRENTLY IF EXISTS "ix_flights_departureDate";
+
+-- Flight search: departure/arrival airports, then the date range in keyset order.
+DROP INDEX CONCURRENTLY IF EXISTS "ix_flights_route_departureDate";
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_flights_route_departureDate"
+    ON flights ("departureAirportCode", "arrivalAirportCode", "departureDate", id);
+
+-- A flight's history newest first by (timestamp, id), read backwards; priceEur
+-- is carried along for the min/max stats.
+DROP INDEX CONCURRENTLY IF EXISTS "ix_flightPriceHistory_flightId_timestamp_id";
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_flightPriceHistory_flightId_timestamp_id"
+    ON "flightPriceHistory" ("flightId", timestamp, id) INCLUDE ("priceEur");
+DROP INDEX CONCURRENTLY IF EXISTS "ix_flightPriceHistory_flightId";
+
+-- Active subscriptions of re-priced flights, matched on their target price.
+DROP INDEX CONCURRENTLY IF EXISTS "ix_subscriptions_active_flightId_targetPrice";
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_subscriptions_active_flightId_targetPrice"
+    ON subscriptions ("flightId", "targetPrice")
+    WHERE "isActive";
@@ -0,0 +1,27 @@
+-- Versions behind the ETag/Last-Modified validators, moved in the transaction
+-- of every write recorded with app.crud.change_tracker.mark_changed so all
+-- processes (API workers, the scheduler, the maintenance CLI) share them.
+-- "modifiedAt" is UTC. A hand-written SQL change should bump the row too, e.g.
+--   UPDATE "tableVersions" SET version = version + 1, "modifiedAt" = now() at time zone 'utc'
+--   WHERE name = 'flights';
+CREATE TABLE IF NOT EXISTS "tableVersions" (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL,
+    "modifiedAt" TIMESTAMP NOT NULL
+);
+INSERT INTO "tableVersions" (name, version, "modifiedAt")
+VALUES ('flights', 1, now() at time zone 'utc'),
+       ('airports', 1, now() at time zone 'utc'),
+       ('airlines', 1, now() at time zone 'utc')
+ON CONFLICT (name) DO NOTHING;
+
+-- Per flight, for its price history. Flights created later get a row with their
+-- first recorded price.
+CREATE TABLE IF NOT EXISTS "flightHistoryVersions" (
+    "flightId" INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL,
+    "modifiedAt" TIMESTAMP NOT NULL
+);
+INSERT INTO "flightHistoryVersions" ("flightId", version, "modifiedAt")
+SELECT id, 1, now() at time zone 'utc' FROM flights
+ON CONFLICT ("flightId") DO NOTHING;
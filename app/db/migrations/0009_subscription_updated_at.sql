@@ -0,0 +1,17 @@
+-- When each subscription's flight, target or active flag was last written (UTC),
+-- set by a trigger so writes from any process or plain SQL are covered. Price
+-- alerts use it to find subscriptions the in-memory index may not have yet.
+ALTER TABLE subscriptions
+    ADD COLUMN IF NOT EXISTS "updatedAt" TIMESTAMP NOT NULL DEFAULT (now() at time zone 'utc');
+
+CREATE OR REPLACE FUNCTION subscriptions_touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW."updatedAt" := clock_timestamp() at time zone 'utc';
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS subscriptions_touch_updated_at ON subscriptions;
+CREATE TRIGGER subscriptions_touch_updated_at
+    BEFORE INSERT OR UPDATE OF "flightId", "targetPrice", "isActive" ON subscriptions
+    FOR EACH ROW EXECUTE FUNCTION subscriptions_touch_updated_at();
@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- Subscriptions written since a point in time, for the alert matching above.
+DROP INDEX CONCURRENTLY IF EXISTS "ix_subscriptions_updatedAt";
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_subscriptions_updatedAt"
+    ON subscriptions ("updatedAt");
@@ -0,0 +1,9 @@
+-- migrate: no-transaction
+-- Scrape run that queued each alert, so a digest run's pending alerts can be
+-- held back together until the run is over.
+ALTER TABLE "alertOutbox" ADD COLUMN IF NOT EXISTS "runId" VARCHAR(32);
+
+DROP INDEX CONCURRENTLY IF EXISTS "ix_alertOutbox_pending_runId";
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_alertOutbox_pending_runId"
+    ON "alertOutbox" ("runId")
+    WHERE status = 'pending';
@@ -4,3 +4,9 @@ from .flight import Flight
 from .flight_price_history import FlightPriceHistory
 from .user import User
 from .subscription import Subscription
+from .scraper_credential import ScraperCredential
+from .exchange_rate import ExchangeRate
+from .scrape_digest import ScrapeDigest
+from .alert_outbox import AlertOutbox
+from .table_version import TableVersion
+from .flight_history_version import FlightHistoryVersion
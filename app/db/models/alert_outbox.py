@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from app.db.base import Base
+
+
+class AlertOutbox(Base):
+    __tablename__ = "alertOutbox"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotencyKey = Column(String(100), unique=True, nullable=False)
+    subscriptionId = Column(
+        Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), nullable=False
+    )
+    flightId = Column(
+        Integer, ForeignKey("flights.id", ondelete="CASCADE"), nullable=False
+    )
+    email = Column(String(100), nullable=False)
+    targetPrice = Column(Float, nullable=False)
+    priceEur = Column(Float, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    nextAttemptAt = Column(DateTime, nullable=False)
+    createdAt = Column(DateTime, nullable=False)
+    sentAt = Column(DateTime)
+    lastError = Column(Text)
+    # Scrape run that queued the alert, if any.
+    runId = Column(String(32))
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, DateTime, Float, String
+from app.db.base import Base
+
+
+class ExchangeRate(Base):
+    __tablename__ = "exchangeRates"
+    baseCurrency = Column(String(3), primary_key=True)
+    quoteCurrency = Column(String(3), primary_key=True)
+    rate = Column(Float, nullable=False)
+    fetchedAt = Column(DateTime, nullable=False)
@@ -1,11 +1,11 @@
-from sqlalchemy import Column, DateTime, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, Float, ForeignKey, Index
 from app.db.base import Base
 
 
 class Flight(Base):
     __tablename__ = "flights"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    departureDate = Column(DateTime, index=True, nullable=False)
+    departureDate = Column(DateTime, nullable=False)
     price = Column(Float, nullable=False)
     priceEur = Column(Float, nullable=False)
     departureAirportCode = Column(
@@ -13,3 +13,26 @@ class Flight(Base):
     )
     arrivalAirportCode = Column(String(10), ForeignKey("airports.code"), nullable=False)
     airlineCode = Column(String(10), ForeignKey("airlines.code"), nullable=False)
+    # Maintained at ingest from flightPriceHistory; see crud.flight.reconcile_price_stats.
+    minPriceEur = Column(Float)
+    maxPriceEur = Column(Float)
+    lastChangedAt = Column(DateTime)
+
+    __table_args__ = (
+        Index(
+            "uq_flights_natural_key",
+            "departureDate",
+            "departureAirportCode",
+            "arrivalAirportCode",
+            "airlineCode",
+            unique=True,
+        ),
+        Index("ix_flights_departureDate_id", "departureDate", "id"),
+        Index(
+            "ix_flights_route_departureDate",
+            "departureAirportCode",
+            "arrivalAirportCode",
+            "departureDate",
+            "id",
+        ),
+    )
@@ -0,0 +1,9 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer
+from app.db.base import Base
+
+
+class FlightHistoryVersion(Base):
+    __tablename__ = "flightHistoryVersions"
+    flightId = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    modifiedAt = Column(DateTime, nullable=False)
@@ -1,11 +1,21 @@
-from sqlalchemy import Column, DateTime, Integer, Float, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, Float, ForeignKey, Index
 from app.db.base import Base
 
 
 class FlightPriceHistory(Base):
     __tablename__ = "flightPriceHistory"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    flightId = Column(Integer, ForeignKey("flights.id"), index=True, nullable=False)
+    flightId = Column(Integer, ForeignKey("flights.id"), nullable=False)
     price = Column(Float, nullable=False)
     priceEur = Column(Float, nullable=False)
     timestamp = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_flightPriceHistory_flightId_timestamp_id",
+            "flightId",
+            "timestamp",
+            "id",
+            postgresql_include=["priceEur"],
+        ),
+    )
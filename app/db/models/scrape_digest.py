@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, String
+from app.db.base import Base
+
+
+class ScrapeDigest(Base):
+    __tablename__ = "scrapeDigests"
+    airlineCode = Column(String(10), primary_key=True)
+    departureAirportCode = Column(String(10), primary_key=True)
+    arrivalAirportCode = Column(String(10), primary_key=True)
+    searchMonth = Column(String(7), primary_key=True)
+    digest = Column(String(64), nullable=False)
+    processedAt = Column(DateTime, nullable=False)
+    checkedAt = Column(DateTime, nullable=False)
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, DateTime, String
+from app.db.base import Base
+
+
+class ScraperCredential(Base):
+    __tablename__ = "scraperCredentials"
+    name = Column(String(50), primary_key=True)
+    value = Column(String(255), nullable=False)
+    fetchedAt = Column(DateTime, nullable=False)
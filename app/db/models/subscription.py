@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    text,
+)
 from app.db.base import Base
 
 
@@ -9,3 +19,19 @@ class Subscription(Base):
     targetPrice = Column(Float, nullable=False)
     isActive = Column(Boolean, default=True, nullable=False)
     email = Column(String(100), ForeignKey("users.email"), nullable=False, index=True)
+    # Set by a trigger on every write of flightId, targetPrice or isActive.
+    updatedAt = Column(
+        DateTime,
+        nullable=False,
+        server_default=text("(now() at time zone 'utc')"),
+        index=True,
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_subscriptions_active_flightId_targetPrice",
+            "flightId",
+            "targetPrice",
+            postgresql_where=text('"isActive"'),
+        ),
+    )
@@ -0,0 +1,9 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+from app.db.base import Base
+
+
+class TableVersion(Base):
+    __tablename__ = "tableVersions"
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    modifiedAt = Column(DateTime, nullable=False)
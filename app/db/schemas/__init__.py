@@ -4,9 +4,11 @@ from .flight import FlightCreate
 from .flight import ScrapedFlight
 from .flight import FlightUpdate
 from .flight import FlightOut
+from .flight import CalendarDayOut
 from .flight import ScrapedDataPayload
 from .flight_price_history import FlightPriceHistoryCreate
 from .flight_price_history import FlightPriceHistoryOut
+from .flight_price_history import PriceBucketOut
 from .user import UserCreate
 from .user import UserUpdate
 from .user import UserOut
@@ -16,3 +18,5 @@ from .subscription import SubscriptionUpdate
 from .airline import AirlineCreate
 from .airline import AirlineUpdate
 from .airline import AirlineOut
+from .scraper import ScrapeJobStatus
+from .scraper import ScrapeTriggerOut
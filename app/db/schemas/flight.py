@@ -1,6 +1,6 @@
 from typing import List, Optional
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 
 
 class FlightBase(BaseModel):
@@ -30,6 +30,19 @@ class FlightOut(FlightBase):
     bookingUrl: Optional[str] = None
     minPrice: Optional[float] = None
     maxPrice: Optional[float] = None
+    lastChangedAt: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CalendarDayOut(BaseModel):
+    day: date
+    priceEur: float
+    flightId: int
+    airlineCode: str
+    departureAirportCode: str
+    arrivalAirportCode: str
 
     class Config:
         from_attributes = True
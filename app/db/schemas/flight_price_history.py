@@ -19,3 +19,15 @@ class FlightPriceHistoryCreate(FlightPriceHistoryBase):
 
 class FlightPriceHistoryOut(FlightPriceHistoryBase):
     id: int
+
+
+class PriceBucketOut(BaseModel):
+    bucketStart: datetime
+    open: float
+    low: float
+    high: float
+    close: float
+    count: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,19 @@
+from typing import Dict, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class ScrapeJobStatus(BaseModel):
+    job: str
+    intervalMinutes: Optional[int] = None
+    nextRunTime: Optional[datetime] = None
+    running: bool
+    lastStartedAt: Optional[datetime] = None
+    lastFinishedAt: Optional[datetime] = None
+    lastStatus: Optional[str] = None
+    lastError: Optional[str] = None
+
+
+class ScrapeTriggerOut(BaseModel):
+    message: str
+    jobs: Dict[str, str]
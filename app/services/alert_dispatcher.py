@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Tuple
+
+from app.crud import alert_outbox
+from app.db.executor import run_db
+from app.services import booking_url_service, email_alerts, email_delivery
+
+logger = logging.getLogger(__name__)
+
+ALERT_DISPATCH_INTERVAL_SECONDS = int(
+    os.getenv("ALERT_DISPATCH_INTERVAL_SECONDS", "30")
+)
+ALERT_DISPATCH_BATCH_SIZE = int(os.getenv("ALERT_DISPATCH_BATCH_SIZE", "100"))
+ALERT_MAX_ATTEMPTS = int(os.getenv("ALERT_MAX_ATTEMPTS", "5"))
+ALERT_RETRY_BASE_DELAY_SECONDS = 60
+ALERT_SEND_LEASE_SECONDS = 600
+
+
+def _alert_details(alert):
+    return (
+        {
+            "originAirportCode": alert.departureAirportCode,
+            "arrivalAirportCode": alert.arrivalAirportCode,
+            "departureDate": alert.departureDate.isoformat(),
+            "bookingUrl": booking_url_service.generate_booking_url(alert),
+        },
+        alert.targetPrice,
+        alert.priceEur,
+    )
+
+
+def _build_message(alerts) -> EmailMessage:
+    if len(alerts) == 1:
+        return email_alerts.build_price_alert_email(
+            alerts[0].email, *_alert_details(alerts[0]), alerts[0].idempotencyKey
+        )
+    return email_alerts.build_price_alert_digest_email(
+        alerts[0].email,
+        [_alert_details(alert) for alert in alerts],
+        [alert.idempotencyKey for alert in alerts],
+    )
+
+
+def _build_messages(claimed) -> List[Tuple[list, EmailMessage]]:
+    """
+    Pairs claimed alerts with the message that delivers them: one per alert, or
+    in ALERT_DIGEST_MODE one per recipient covering all of their alerts.
+    """
+    if email_alerts.ALERT_DIGEST_MODE:
+        by_email = defaultdict(list)
+        for alert in claimed:
+            by_email[alert.email].append(alert)
+        groups = list(by_email.values())
+    else:
+        groups = [[alert] for alert in claimed]
+    return [(alerts, _build_message(alerts)) for alerts in groups]
+
+
+async def _dispatch_batch() -> int:
+    """
+    Sends one batch of due alerts and returns how many messages it took. In
+    ALERT_DIGEST_MODE the batch holds every due alert of up to
+    ALERT_DISPATCH_BATCH_SIZE recipients, so a recipient's alerts are never
+    split across batches.
+    """
+    now = datetime.now()
+    claimed = await run_db(
+        alert_outbox.claim_due_alerts,
+        ALERT_DISPATCH_BATCH_SIZE,
+        now,
+        now + timedelta(seconds=ALERT_SEND_LEASE_SECONDS),
+        by_recipient=email_alerts.ALERT_DIGEST_MODE,
+    )
+    if not claimed:
+        return 0
+    messages = _build_messages(claimed)
+    results = await asyncio.gather(
+        *(
+            asyncio.wrap_future(email_delivery.delivery_worker.submit(message))
+            for _, message in messages
+        ),
+        return_exceptions=True,
+    )
+
+    now = datetime.now()
+    sent_ids, failures = [], []
+    delivered = [
+        (alert, result)
+        for (alerts, _), result in zip(messages, results)
+        for alert in alerts
+    ]
+    for alert, result in delivered:
+        if not isinstance(result, Exception):
+            sent_ids.append(alert.id)
+            continue
+        if alert.attempts >= ALERT_MAX_ATTEMPTS:
+            logger.error(
+                f"Giving up on alert {alert.id} to {alert.email} after {alert.attempts} attempts: {result}"
+            )
+            failures.append((alert.id, alert_outbox.FAILED, now, str(result)))
+        else:
+            delay = ALERT_RETRY_BASE_DELAY_SECONDS * 2 ** (alert.attempts - 1)
+            logger.warning(
+                f"Failed to send alert {alert.id} to {alert.email}, retrying in {delay}s: {result}"
+            )
+            failures.append(
+                (
+                    alert.id,
+                    alert_outbox.PENDING,
+                    now + timedelta(seconds=delay),
+                    str(result),
+                )
+            )
+    await run_db(alert_outbox.mark_sent, sent_ids, now)
+    await run_db(alert_outbox.mark_failed, failures)
+    logger.info(
+        f"Alert dispatch: {len(sent_ids)} sent, {len(failures)} failed of {len(claimed)} in {len(messages)} messages."
+    )
+    return len(messages)
+
+
+async def dispatch_pending_alerts():
+    """
+    Drains the due alerts of the outbox batch by batch. An alert is claimed
+    before sending and marked sent or rescheduled with exponential backoff
+    afterwards, so no DB transaction is held open while talking to SMTP.
+    """
+    if not email_alerts.EMAIL_USER:
+        logger.debug("EMAIL_USER is not set. Leaving queued alerts undelivered.")
+        return
+    while await _dispatch_batch() == ALERT_DISPATCH_BATCH_SIZE:
+        pass
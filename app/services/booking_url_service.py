@@ -1,5 +1,10 @@
+import os
 from app.db import models
 from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple
+
+BOOKING_URL_CACHE_SIZE = int(os.getenv("BOOKING_URL_CACHE_SIZE", "50000"))
 
 def generate_nouvelair_booking_url(flight: models.Flight) -> str | None:
     if getattr(flight, "airlineCode", None) != "BJ":
@@ -60,4 +65,30 @@ def generate_booking_url(flight: models.Flight) -> str | None:
     elif airline_code == "TU":
         return generate_tunisair_booking_url(flight)
     else:
-        return None
\ No newline at end of file
+        return None
+
+
+class BookingUrlKey(NamedTuple):
+    airlineCode: str
+    departureAirportCode: str
+    arrivalAirportCode: str
+    departureDate: datetime
+
+
+@lru_cache(maxsize=BOOKING_URL_CACHE_SIZE)
+def _cached_booking_url(key: BookingUrlKey) -> str | None:
+    return generate_booking_url(key)  # type: ignore[arg-type]
+
+
+def generate_booking_url_for(
+    airline_code: str,
+    departure_airport_code: str,
+    arrival_airport_code: str,
+    departure_date: datetime,
+) -> str | None:
+    """Memoized generate_booking_url from plain column values, for list endpoints."""
+    return _cached_booking_url(
+        BookingUrlKey(
+            airline_code, departure_airport_code, arrival_airport_code, departure_date
+        )
+    )
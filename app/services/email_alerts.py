@@ -1,23 +1,24 @@
+import hashlib
 import os
 import platform
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from email.message import EmailMessage
-import smtplib
+from string import Template
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
+from app.crud import alert_outbox as crud_alert_outbox
 from app.crud import subscription as crud_subscription
-from app.db import schemas
-from app.services import booking_url_service
+from app.db import models
+from app.services import subscription_index
 
 load_dotenv()
 
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
-
-if not EMAIL_USER or not EMAIL_PASS:
-    raise ValueError("EMAIL_USER and EMAIL_PASS must be set in environment variables")
+MESSAGE_ID_DOMAIN = (EMAIL_USER or "").rpartition("@")[2] or "localhost"
 
 logger = logging.getLogger("flight_alerts")
 logger.setLevel(logging.INFO)
@@ -26,123 +27,259 @@ formatter = logging.Formatter("%(asctime)s %(levelname)s: %(message)s")
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
+if not EMAIL_USER or not EMAIL_PASS:
+    logger.warning(
+        "EMAIL_USER and EMAIL_PASS are not set. Price alert emails will not be sent."
+    )
 
-def send_price_alert_email(
-    to_email: str, flight_details: dict, target_price: float, current_price: float
-):
-    raw_date = flight_details.get("departureDate")
-    day_format_specifier = "%#d" if platform.system() == "Windows" else "%-d"
-
-    try:
-        if isinstance(raw_date, datetime):
-            date_format = f"{day_format_specifier} %b %Y"
-            departure_date = raw_date.strftime(date_format)
-        else:
-            date_format = f"{day_format_specifier} %b %Y"
-            departure_date = datetime.fromisoformat(str(raw_date)).strftime(date_format)
-    except Exception as e:
-        logger.warning(f"Failed to parse departure date: {e}")
-        departure_date = str(raw_date)
-
-    booking_url = flight_details.get("bookingUrl")
 
-    subject = "✈️ Flight Price Alert"
+ALERT_DIGEST_MODE = os.getenv("ALERT_DIGEST_MODE", "false").lower() == "true"
+ALERT_DIGEST_WINDOW_SECONDS = int(os.getenv("ALERT_DIGEST_WINDOW_SECONDS", "300"))
 
-    link_html = ""
-    if booking_url:
-        link_html = f"<p><a href='{booking_url}' style='display: inline-block; padding: 10px 20px; background-color: #007bff; color: white; text-decoration: none; border-radius: 5px;'>Book Now! ✈️</a></p>"
+_DAY_FORMAT = "%#d" if platform.system() == "Windows" else "%-d"
+_BOOK_NOW_STYLE = "display: inline-block; padding: 10px 20px; background-color: #007bff; color: white; text-decoration: none; border-radius: 5px;"
 
-    html_body = f"""
+# Parsed once at import; only substitution runs per message.
+ALERT_HTML_TEMPLATE = Template(
+    """
     <html>
     <head></head>
     <body>
         <p>Good news! 🎉</p>
         <p>The flight you were watching has dropped below your target price.</p>
-        <p>
-            <strong>🛫 Flight:</strong> {flight_details.get('originAirportCode')} ➡️ {flight_details.get('arrivalAirportCode')}<br>
-            <strong>📅 Departure Date:</strong> {departure_date}<br>
-            <strong>🎯 Your Target Price:</strong> {target_price:.2f}€<br>
-            <strong>💰 Current Price:</strong> {current_price:.2f}€
-        </p>
-        {link_html}
+        $flight_html
         <p><i>Note: You will no longer receive alerts for this flight unless you reactivate it.</i></p>
         <p>Happy travels! 🧳</p>
     </body>
     </html>
     """
+)
+DIGEST_HTML_TEMPLATE = Template(
+    """
+    <html>
+    <head></head>
+    <body>
+        <p>Good news! 🎉</p>
+        <p>$count flights you were watching have dropped below your target price.</p>
+        $flights_html
+        <p><i>Note: You will no longer receive alerts for these flights unless you reactivate them.</i></p>
+        <p>Happy travels! 🧳</p>
+    </body>
+    </html>
+    """
+)
+FLIGHT_HTML_TEMPLATE = Template(
+    """<p>
+            <strong>🛫 Flight:</strong> $origin ➡️ $arrival<br>
+            <strong>📅 Departure Date:</strong> $departure_date<br>
+            <strong>🎯 Your Target Price:</strong> $target_price€<br>
+            <strong>💰 Current Price:</strong> $current_price€
+        </p>
+        $link_html"""
+)
+BOOK_NOW_HTML_TEMPLATE = Template(
+    f"<p><a href='$booking_url' style='{_BOOK_NOW_STYLE}'>Book Now! ✈️</a></p>"
+)
+ALERT_TEXT_TEMPLATE = Template(
+    "Good news! 🎉\n\n"
+    "The flight you were watching has dropped below your target price.\n\n"
+    "$flight_text"
+    "📩 Note: You will no longer receive alerts for this flight unless you reactivate it.\n\n"
+    "Happy travels! 🧳\n"
+)
+DIGEST_TEXT_TEMPLATE = Template(
+    "Good news! 🎉\n\n"
+    "$count flights you were watching have dropped below your target price.\n\n"
+    "$flights_text\n"
+    "📩 Note: You will no longer receive alerts for these flights unless you reactivate them.\n\n"
+    "Happy travels! 🧳\n"
+)
+FLIGHT_TEXT_TEMPLATE = Template(
+    "🛫 Flight: $origin ➡ $arrival\n"
+    "📅 Departure Date: $departure_date\n"
+    "🎯 Your Target Price: $target_price€\n"
+    "💰 Current Price: $current_price€\n"
+    "$link_text"
+)
+
+
+def _format_departure_date(raw_date) -> str:
+    try:
+        if not isinstance(raw_date, datetime):
+            raw_date = datetime.fromisoformat(str(raw_date))
+        return raw_date.strftime(f"{_DAY_FORMAT} %b %Y")
+    except Exception as e:
+        logger.warning(f"Failed to parse departure date: {e}")
+        return str(raw_date)
+
 
-    plain_text_book_now_link = ""
-    if booking_url:
-        plain_text_book_now_link = f"Book Now: {booking_url}\n"
-
-    plain_text_body = (
-        f"Good news! 🎉\n\n"
-        f"The flight you were watching has dropped below your target price.\n\n"
-        f"🛫 Flight: {flight_details.get('originAirportCode')} ➡ {flight_details.get('arrivalAirportCode')}\n"
-        f"📅 Departure Date: {departure_date}\n"
-        f"🎯 Your Target Price: {target_price:.2f}€\n"
-        f"💰 Current Price: {current_price:.2f}€\n"
-        f"{plain_text_book_now_link}"
-        f"📩 Note: You will no longer receive alerts for this flight unless you reactivate it.\n\n"
-        f"Happy travels! 🧳\n"
+def _render_flight(
+    flight_details: dict, target_price: float, current_price: float
+) -> Tuple[str, str]:
+    booking_url = flight_details.get("bookingUrl")
+    fields = {
+        "origin": flight_details.get("originAirportCode"),
+        "arrival": flight_details.get("arrivalAirportCode"),
+        "departure_date": _format_departure_date(flight_details.get("departureDate")),
+        "target_price": f"{target_price:.2f}",
+        "current_price": f"{current_price:.2f}",
+    }
+    html = FLIGHT_HTML_TEMPLATE.substitute(
+        fields,
+        link_html=(
+            BOOK_NOW_HTML_TEMPLATE.substitute(booking_url=booking_url)
+            if booking_url
+            else ""
+        ),
+    )
+    text = FLIGHT_TEXT_TEMPLATE.substitute(
+        fields, link_text=f"Book Now: {booking_url}\n" if booking_url else ""
     )
+    return html, text
 
+
+def _build_message(
+    to_email: str, subject: str, html_body: str, plain_text_body: str, message_key: str
+) -> EmailMessage:
     msg = EmailMessage()
     msg["From"] = EMAIL_USER
     msg["To"] = to_email
     msg["Subject"] = subject
+    # Derived from the outbox key(s), so a re-sent alert keeps its Message-ID
+    # and mail providers can drop the duplicate.
+    msg["Message-ID"] = f"<{message_key}@{MESSAGE_ID_DOMAIN}>"
     msg.set_content(plain_text_body)
     msg.add_alternative(html_body, subtype="html")
+    return msg
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(EMAIL_USER, EMAIL_PASS)
-            smtp.send_message(msg)
-        logger.info(f"Email sent to {to_email}")
-    except Exception as e:
-        logger.error(f"Failed to send email to {to_email}: {e}")
-
-
-def check_and_send_alerts_for_flights(db: Session, updated_flights_info: list):
-    if not updated_flights_info:
-        return
-    logger.info("Checking subscriptions for recently updated flights...")
-    for item in updated_flights_info:
-        db_flight = item["flight"]
-        old_price_eur = item.get("old_price_eur")
-
-        if old_price_eur is None:
-            continue
-
-        subscriptions = crud_subscription.get_active_subscriptions_for_flight_with_notifications_enabled(
-            db, db_flight.id
-        )
-
-        booking_url = booking_url_service.generate_nouvelair_booking_url(db_flight)
-
-        for sub in subscriptions:
-            target_price = sub.targetPrice
-            updated_price_eur = db_flight.priceEur
-
-            if (old_price_eur > target_price) and (updated_price_eur <= target_price):
-                logger.info(f"ALERT TRIGGERED for {sub.email} on Flight {db_flight.id}")
-                send_price_alert_email(
-                    to_email=sub.email,
-                    flight_details={
-                        "originAirportCode": db_flight.departureAirportCode,
-                        "arrivalAirportCode": db_flight.arrivalAirportCode,
-                        "departureDate": db_flight.departureDate.isoformat(),
-                        "bookingUrl": booking_url,
-                    },
-                    target_price=target_price,
-                    current_price=updated_price_eur,
-                )
-
-                sub_update_schema = schemas.SubscriptionUpdate(isActive=False)
-                crud_subscription.update_subscription(db, sub.id, sub_update_schema)
-                logger.info(f"Subscription {sub.id} set to inactive after alert.")
-            else:
-                logger.debug(
-                    f"Subscription {sub.id} for {sub.email} (Target: {target_price:.2f}€, Prev: {old_price_eur:.2f}€, New: {updated_price_eur:.2f}€) - No alert needed."
-                )
-    logger.info("Finished checking subscriptions for updated flights.")
\ No newline at end of file
+
+def build_price_alert_email(
+    to_email: str,
+    flight_details: dict,
+    target_price: float,
+    current_price: float,
+    idempotency_key: str,
+) -> EmailMessage:
+    flight_html, flight_text = _render_flight(
+        flight_details, target_price, current_price
+    )
+    return _build_message(
+        to_email,
+        "✈️ Flight Price Alert",
+        ALERT_HTML_TEMPLATE.substitute(flight_html=flight_html),
+        ALERT_TEXT_TEMPLATE.substitute(flight_text=flight_text),
+        idempotency_key,
+    )
+
+
+def build_price_alert_digest_email(
+    to_email: str, alerts: List[Tuple[dict, float, float]], idempotency_keys: List[str]
+) -> EmailMessage:
+    """
+    One message for several (flight_details, target_price, current_price)
+    alerts of the same user. Its Message-ID hashes the alerts' outbox keys.
+    """
+    rendered = [_render_flight(*alert) for alert in alerts]
+    digest_key = hashlib.sha256(
+        "\n".join(sorted(idempotency_keys)).encode()
+    ).hexdigest()[:32]
+    return _build_message(
+        to_email,
+        f"✈️ Flight Price Alerts: {len(alerts)} flights dropped",
+        DIGEST_HTML_TEMPLATE.substitute(
+            count=len(alerts),
+            flights_html="\n        ".join(html for html, _ in rendered),
+        ),
+        DIGEST_TEXT_TEMPLATE.substitute(
+            count=len(alerts), flights_text="\n".join(text for _, text in rendered)
+        ),
+        f"price-alert-digest.{digest_key}",
+    )
+
+
+def _find_triggered_subscriptions(
+    db: Session, price_changes: List[Tuple[int, float, float]]
+) -> List[Tuple[models.Subscription, float]]:
+    """
+    Matches the changes against the in-memory threshold index and loads only the
+    matched subscriptions, re-checking their target against the DB row in case
+    the index is behind. Flights with a subscription written since the index
+    was loaded, which it may be missing, and all flights when there is no index,
+    go through the set-based query instead.
+    """
+    if not subscription_index.is_ready():
+        return crud_subscription.get_triggered_subscriptions(db, price_changes)
+    unindexed = crud_subscription.get_flights_with_subscriptions_written_since(
+        db,
+        subscription_index.loaded_before(),
+        {flight_id for flight_id, _, _ in price_changes},
+    )
+    triggered = crud_subscription.get_triggered_subscriptions(
+        db, [change for change in price_changes if change[0] in unindexed]
+    )
+    matched = subscription_index.match(
+        [change for change in price_changes if change[0] not in unindexed]
+    )
+    for sub in crud_subscription.get_notifiable_subscriptions(db, list(matched)):
+        old_price_eur, new_price_eur = matched[sub.id]
+        if old_price_eur > sub.targetPrice >= new_price_eur:
+            triggered.append((sub, new_price_eur))
+    return triggered
+
+
+def enqueue_price_alerts(
+    db: Session,
+    price_updates: List[dict],
+    now: datetime,
+    run_id: Optional[str] = None,
+) -> List[int]:
+    """
+    Queues alerts for re-priced flights in the caller's transaction: crossed
+    subscriptions are found (see _find_triggered_subscriptions), one UPDATE
+    deactivates them, and an outbox row is added for each subscription that
+    UPDATE claimed, tagged with the scrape run `run_id`. Returns the claimed
+    ids; delivery is left to the alert dispatcher.
+    """
+    triggered = _find_triggered_subscriptions(
+        db,
+        [
+            (u["id"], u["old_price_eur"], u["priceEur"])
+            for u in price_updates
+            if u.get("old_price_eur") is not None
+        ],
+    )
+    claimed_ids = set(
+        crud_subscription.deactivate_subscriptions(db, [sub.id for sub, _ in triggered])
+    )
+    # In digest mode, alerts wait out a window so that those of one scrape run
+    # become due together and can share a message per user. Each chunk of a run
+    # moves the run's pending alerts to its own window, so they stay held until
+    # ALERT_DIGEST_WINDOW_SECONDS after the run's last chunk.
+    next_attempt_at = now + timedelta(
+        seconds=ALERT_DIGEST_WINDOW_SECONDS if ALERT_DIGEST_MODE else 0
+    )
+    if ALERT_DIGEST_MODE and run_id is not None:
+        crud_alert_outbox.postpone_run(db, run_id, next_attempt_at)
+    crud_alert_outbox.enqueue_alerts(
+        db,
+        [
+            {
+                "idempotencyKey": f"price-alert.{sub.id}.{sub.flightId}.{now:%Y%m%d%H%M%S%f}",
+                "subscriptionId": sub.id,
+                "flightId": sub.flightId,
+                "email": sub.email,
+                "targetPrice": sub.targetPrice,
+                "priceEur": new_price_eur,
+                "status": crud_alert_outbox.PENDING,
+                "attempts": 0,
+                "nextAttemptAt": next_attempt_at,
+                "createdAt": now,
+                "runId": run_id,
+            }
+            for sub, new_price_eur in triggered
+            if sub.id in claimed_ids
+        ],
+    )
+    if claimed_ids:
+        logger.info(f"ALERTS TRIGGERED: {len(claimed_ids)} queued for delivery.")
+    return list(claimed_ids)
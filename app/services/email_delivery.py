@@ -0,0 +1,177 @@
+import logging
+import os
+import queue
+import smtplib
+import threading
+from concurrent.futures import Future
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "true").lower() == "true"
+SMTP_MAX_CONNECTIONS = int(os.getenv("SMTP_MAX_CONNECTIONS", "2"))
+SMTP_BATCH_SIZE = int(os.getenv("SMTP_BATCH_SIZE", "20"))
+SMTP_IDLE_TIMEOUT_SECONDS = float(os.getenv("SMTP_IDLE_TIMEOUT_SECONDS", "60"))
+SMTP_TIMEOUT_SECONDS = 30
+SMTP_SEND_ATTEMPTS = 2
+
+_STOP = object()
+
+
+class EmailDeliveryWorker:
+    """
+    Queue-backed SMTP sender. Each of up to `max_connections` threads keeps one
+    authenticated connection open, takes up to `batch_size` queued messages at a
+    time and sends them over it. A connection that drops is re-opened and the
+    message retried; one left idle for `idle_timeout` seconds is closed.
+
+    `submit` never blocks on SMTP and returns a Future resolved once the message
+    is accepted by the server. Point `host`/`port` at a local stand-in such as
+    aiosmtpd (with `use_ssl=False`) to exercise it; login is skipped when the
+    server does not offer AUTH.
+    """
+
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        use_ssl: bool = SMTP_USE_SSL,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        max_connections: int = SMTP_MAX_CONNECTIONS,
+        batch_size: int = SMTP_BATCH_SIZE,
+        idle_timeout: float = SMTP_IDLE_TIMEOUT_SECONDS,
+    ):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.username = username
+        self.password = password
+        self.max_connections = max_connections
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._threads = [
+                threading.Thread(target=self._run, name=f"smtp-sender-{i}", daemon=True)
+                for i in range(self.max_connections)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def submit(self, message: EmailMessage) -> Future:
+        self.start()
+        future: Future = Future()
+        self._queue.put((message, future))
+        return future
+
+    def stop(self, timeout: Optional[float] = None):
+        """Delivers what is already queued, then closes every connection."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+            for _ in threads:
+                self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            smtp: smtplib.SMTP = smtplib.SMTP_SSL(
+                self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS
+            )
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        smtp.ehlo_or_helo_if_needed()
+        if self.username and self.password and smtp.has_extn("auth"):
+            smtp.login(self.username, self.password)
+        return smtp
+
+    @staticmethod
+    def _close(smtp: Optional[smtplib.SMTP]):
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def _next_batch(self) -> Tuple[List[Tuple[EmailMessage, Future]], bool]:
+        """Blocks for one message (up to the idle timeout), then drains more."""
+        batch: List[Tuple[EmailMessage, Future]] = []
+        try:
+            item = self._queue.get(timeout=self.idle_timeout)
+        except queue.Empty:
+            return batch, False
+        while True:
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+
+    def _send(
+        self, smtp: Optional[smtplib.SMTP], message: EmailMessage, future: Future
+    ) -> Optional[smtplib.SMTP]:
+        """Sends one message, reconnecting once if needed; returns the connection."""
+        for attempt in range(1, SMTP_SEND_ATTEMPTS + 1):
+            try:
+                if smtp is None:
+                    smtp = self._connect()
+                smtp.send_message(message)
+                future.set_result(message["To"])
+                return smtp
+            except smtplib.SMTPRecipientsRefused as e:
+                # The session is still usable; only this message is rejected.
+                future.set_exception(e)
+                return smtp
+            except (smtplib.SMTPException, OSError) as e:
+                self._close(smtp)
+                smtp = None
+                if attempt == SMTP_SEND_ATTEMPTS:
+                    future.set_exception(e)
+                else:
+                    logger.warning(
+                        f"Sending email to {message['To']} failed, reconnecting: {e}"
+                    )
+        return smtp
+
+    def _run(self):
+        smtp: Optional[smtplib.SMTP] = None
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if not batch:
+                # Idle: release the connection rather than let the server drop it.
+                self._close(smtp)
+                smtp = None
+                continue
+            for message, future in batch:
+                if future.set_running_or_notify_cancel():
+                    smtp = self._send(smtp, message, future)
+        self._close(smtp)
+
+
+delivery_worker = EmailDeliveryWorker(
+    username=os.getenv("EMAIL_USER"), password=os.getenv("EMAIL_PASS")
+)
+
+
+def shutdown_delivery_worker():
+    delivery_worker.stop(timeout=SMTP_TIMEOUT_SECONDS)
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.crud import exchange_rate
+from app.db.executor import run_db
+
+logger = logging.getLogger(__name__)
+
+EXCHANGE_RATE_API_URL = "https://v6.exchangerate-api.com/v6/{api_key}/latest/{base}"
+EXCHANGE_RATE_TTL_HOURS = float(os.getenv("EXCHANGE_RATE_TTL_HOURS", "12"))
+EXCHANGE_RATE_REQUEST_RETRIES = 3
+EXCHANGE_RATE_RETRY_BASE_DELAY_SECONDS = 0.5
+FALLBACK_EXCHANGE_RATES: Dict[Tuple[str, str], float] = {("TND", "EUR"): 0.29}
+
+_rate_cache: Dict[Tuple[str, str], Tuple[float, datetime]] = {}
+
+
+def _is_fresh(fetched_at: datetime) -> bool:
+    return datetime.now() - fetched_at < timedelta(hours=EXCHANGE_RATE_TTL_HOURS)
+
+
+async def _fetch_rates(
+    session: httpx.AsyncClient, base_currency: str
+) -> Optional[Dict[str, float]]:
+    api_key = os.getenv("EXCHANGE_RATE_API_KEY")
+    if not api_key:
+        logger.warning("EXCHANGE_RATE_API_KEY not found. Cannot refresh rates.")
+        return None
+    url = EXCHANGE_RATE_API_URL.format(api_key=api_key, base=base_currency)
+    for attempt in range(EXCHANGE_RATE_REQUEST_RETRIES):
+        try:
+            response = await session.get(url, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            if data.get("result") == "success":
+                return {
+                    quote: float(rate)
+                    for quote, rate in data["conversion_rates"].items()
+                }
+        except httpx.HTTPError as e:
+            logger.warning(
+                f"Attempt {attempt + 1}/{EXCHANGE_RATE_REQUEST_RETRIES} to fetch exchange rates failed: {e}"
+            )
+        if attempt < EXCHANGE_RATE_REQUEST_RETRIES - 1:
+            delay = EXCHANGE_RATE_RETRY_BASE_DELAY_SECONDS * 2**attempt
+            await asyncio.sleep(delay + random.uniform(0, delay))
+    return None
+
+
+async def get_exchange_rate(
+    base_currency: str,
+    quote_currency: str,
+    session: Optional[httpx.AsyncClient] = None,
+) -> float:
+    """
+    Returns 1 `base_currency` expressed in `quote_currency`.
+
+    Lookup order: in-process copy, then the exchangeRates table, while either is
+    younger than EXCHANGE_RATE_TTL_HOURS; then the rate API, whose full rate
+    table is stored for later conversions; then the last known rate however old;
+    and only if none was ever fetched, the hard-coded fallback.
+    """
+    pair = (base_currency, quote_currency)
+    cached = _rate_cache.get(pair)
+    if cached and _is_fresh(cached[1]):
+        return cached[0]
+
+    db_rate = await run_db(
+        exchange_rate.get_exchange_rate, base_currency, quote_currency
+    )
+    if db_rate and _is_fresh(db_rate.fetchedAt):
+        _rate_cache[pair] = (db_rate.rate, db_rate.fetchedAt)
+        return db_rate.rate
+
+    if session is None:
+        async with httpx.AsyncClient() as own_session:
+            rates = await _fetch_rates(own_session, base_currency)
+    else:
+        rates = await _fetch_rates(session, base_currency)
+
+    if rates and quote_currency in rates:
+        fetched_at = datetime.now()
+        await run_db(
+            exchange_rate.save_exchange_rates, base_currency, rates, fetched_at
+        )
+        for quote, rate in rates.items():
+            _rate_cache[(base_currency, quote)] = (rate, fetched_at)
+        logger.info(
+            f"Fetched exchange rate: 1 {base_currency} = {rates[quote_currency]:.4f} {quote_currency}"
+        )
+        return rates[quote_currency]
+
+    if db_rate:
+        logger.warning(
+            f"Using last known exchange rate from {db_rate.fetchedAt:%Y-%m-%d %H:%M}: 1 {base_currency} = {db_rate.rate:.4f} {quote_currency}"
+        )
+        _rate_cache[pair] = (db_rate.rate, db_rate.fetchedAt)
+        return db_rate.rate
+
+    fallback_rate = FALLBACK_EXCHANGE_RATES.get(pair)
+    if fallback_rate is None:
+        raise ValueError(
+            f"No exchange rate available for {base_currency}->{quote_currency}"
+        )
+    logger.error(
+        f"No exchange rate available for {base_currency}->{quote_currency}. Using fallback rate: {fallback_rate:.4f}"
+    )
+    return fallback_rate
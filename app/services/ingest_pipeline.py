@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+from app.crud.scrape_digest import SliceKey
+from app.db import schemas
+
+logger = logging.getLogger(__name__)
+
+INGEST_QUEUE_MAXSIZE = int(os.getenv("INGEST_QUEUE_MAXSIZE", "16"))
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "500"))
+
+
+class ScrapedSlice(NamedTuple):
+    """
+    One upstream response: an (airline, route, search month) slice. `flights` is
+    None when the response digest matched the last ingested one and was skipped.
+    """
+
+    key: SliceKey
+    digest: str
+    flights: Optional[List[schemas.ScrapedFlight]]
+
+
+_END_OF_STREAM = object()
+
+
+class IngestPipeline:
+    """
+    Bounded producer/consumer queue between scrape fetchers and the DB writer.
+
+    Fetchers `await put(slice)` as soon as a response is parsed. A single writer
+    task buffers slices and hands them to `flush` whenever the buffered flights
+    reach `chunk_size`, so each chunk is its own commit while fetching goes on.
+    When the writer falls behind, the full queue blocks producers. A writer
+    failure is re-raised to the next producer and when the pipeline closes.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[ScrapedSlice]], Awaitable[None]],
+        chunk_size: int = INGEST_CHUNK_SIZE,
+        maxsize: int = INGEST_QUEUE_MAXSIZE,
+    ):
+        self._flush = flush
+        self._chunk_size = chunk_size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._writer: Optional[asyncio.Task] = None
+        self.slices_count = 0
+        self.skipped_slices_count = 0
+        self.flushed_chunks_count = 0
+
+    async def __aenter__(self):
+        self._writer = asyncio.create_task(self._write())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        assert self._writer is not None
+        if exc_type is asyncio.CancelledError:
+            self._writer.cancel()
+            # Settles the writer, and with it any flush in progress, before the
+            # context exits.
+            await asyncio.gather(self._writer, return_exceptions=True)
+            return False
+        # Drain what was produced so far, even when a producer failed, so every
+        # fetched slice that can be committed is.
+        await self._enqueue(_END_OF_STREAM)
+        try:
+            await self._writer
+        except Exception as writer_error:
+            if exc_type is None:
+                raise
+            if writer_error is not exc:
+                logger.exception("Ingest pipeline writer failed while draining.")
+        return False
+
+    async def put(self, scraped_slice: ScrapedSlice):
+        if not await self._enqueue(scraped_slice):
+            assert self._writer is not None
+            # Surfaces the writer's exception; a finished writer takes no input.
+            self._writer.result()
+            raise RuntimeError("Ingest pipeline writer has already stopped.")
+        self.slices_count += 1
+        if scraped_slice.flights is None:
+            self.skipped_slices_count += 1
+
+    async def _enqueue(self, item) -> bool:
+        """Waits for queue space, giving up if the writer stops in the meantime."""
+        assert self._writer is not None
+        if self._writer.done():
+            return False
+        queued = asyncio.ensure_future(self._queue.put(item))
+        await asyncio.wait({queued, self._writer}, return_when=asyncio.FIRST_COMPLETED)
+        if not queued.done():
+            queued.cancel()
+            return False
+        return True
+
+    async def _write(self):
+        buffered: List[ScrapedSlice] = []
+        buffered_flights = 0
+        while True:
+            item = await self._queue.get()
+            if item is _END_OF_STREAM:
+                break
+            buffered.append(item)
+            buffered_flights += len(item.flights or [])
+            if buffered_flights >= self._chunk_size:
+                await self._flush_chunk(buffered)
+                buffered, buffered_flights = [], 0
+        if buffered:
+            await self._flush_chunk(buffered)
+
+    async def _flush_chunk(self, slices: List[ScrapedSlice]):
+        # A flush runs on the DB thread pool and cannot be interrupted, so a
+        # cancelled writer still waits for it instead of leaving it running.
+        flushing = asyncio.ensure_future(self._flush(slices))
+        try:
+            await asyncio.shield(flushing)
+        except asyncio.CancelledError:
+            await asyncio.gather(flushing, return_exceptions=True)
+            raise
+        self.flushed_chunks_count += 1
@@ -0,0 +1,262 @@
+"""
+Database maintenance commands.
+
+    python -m app.services.maintenance reconcile-price-stats
+    python -m app.services.maintenance check-query-plans
+"""
+
+import argparse
+import json
+import logging
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Iterator, List, Set, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.crud import flight, flight_price_history, subscription
+from app.db.migrate import apply_migrations
+from app.db.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile_price_stats():
+    """Fixes flights whose min/max price or lastChangedAt drifted from their history."""
+    db = SessionLocal()
+    try:
+        fixed_count = flight.reconcile_price_stats(db)
+        db.commit()
+    finally:
+        db.close()
+    logger.info(f"Reconciled price stats: {fixed_count} flights were out of date.")
+
+
+PLAN_CHECK_PREFIX = "ZQ"
+PLAN_CHECK_AIRPORTS = 12
+PLAN_CHECK_DAYS = 365
+PLAN_CHECK_HISTORY_PER_FLIGHT = 5
+PLAN_CHECK_USERS = 1000
+PLAN_CHECK_SUBSCRIPTIONS = 20000
+
+
+def _seed_plan_check_data(db: Session):
+    """
+    Fills the tables with a year of daily flights on every route between
+    PLAN_CHECK_AIRPORTS airports, their history and subscriptions, a quarter of
+    them active. Everything uses codes starting with PLAN_CHECK_PREFIX.
+    """
+    params = {
+        "prefix": PLAN_CHECK_PREFIX,
+        "airports": PLAN_CHECK_AIRPORTS,
+        "days": PLAN_CHECK_DAYS,
+        "history": PLAN_CHECK_HISTORY_PER_FLIGHT,
+        "users": PLAN_CHECK_USERS,
+        "subscriptions": PLAN_CHECK_SUBSCRIPTIONS,
+    }
+    statements = [
+        """
+        INSERT INTO airports (code, name, country)
+        SELECT :prefix || lpad(n::text, 2, '0'), 'Plan check', 'ZZ'
+        FROM generate_series(0, :airports - 1) AS n
+        """,
+        "INSERT INTO airlines (code, name) VALUES (:prefix, 'Plan check')",
+        """
+        INSERT INTO flights ("departureDate", price, "priceEur",
+                             "departureAirportCode", "arrivalAirportCode", "airlineCode")
+        SELECT DATE '2030-01-01' + day, 100 + mod(day * 7 + dep * 13 + arr, 300),
+               100 + mod(day * 7 + dep * 13 + arr, 300),
+               :prefix || lpad(dep::text, 2, '0'), :prefix || lpad(arr::text, 2, '0'),
+               :prefix
+        FROM generate_series(0, :airports - 1) AS dep,
+             generate_series(0, :airports - 1) AS arr,
+             generate_series(0, :days - 1) AS day
+        WHERE dep <> arr
+        """,
+        """
+        INSERT INTO "flightPriceHistory" ("flightId", price, "priceEur", timestamp)
+        SELECT f.id, f.price + n, f."priceEur" + n,
+               TIMESTAMP '2029-06-01' + n * INTERVAL '1 day'
+        FROM flights f, generate_series(1, :history) AS n
+        WHERE f."airlineCode" = :prefix
+        """,
+        """
+        INSERT INTO users (email, "enableNotificationsSetting")
+        SELECT 'plan-check-' || n || '@example.invalid', true
+        FROM generate_series(1, :users) AS n
+        """,
+        """
+        WITH seeded AS (
+            SELECT id, row_number() OVER (ORDER BY id) AS position
+            FROM flights
+            WHERE "airlineCode" = :prefix
+        )
+        INSERT INTO subscriptions ("flightId", "targetPrice", "isActive", email)
+        SELECT seeded.id, 50 + mod(n, 200), mod(n, 4) = 0,
+               'plan-check-' || (1 + mod(n, :users)) || '@example.invalid'
+        FROM generate_series(1, :subscriptions) AS n
+        JOIN seeded ON seeded.position = 1 + mod(n * 37, (SELECT count(*) FROM seeded))
+        """,
+        'ANALYZE flights, "flightPriceHistory", subscriptions, users',
+    ]
+    for statement in statements:
+        db.execute(text(statement), params)
+
+
+@contextmanager
+def _captured_statements(db: Session) -> Iterator[List[Tuple[str, Any]]]:
+    """Collects the SQL (with its parameters) executed on the session meanwhile."""
+    connection = db.connection()
+    captured: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        yield captured
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+
+def _index_names(plan_node: dict) -> Set[str]:
+    names = {plan_node["Index Name"]} if "Index Name" in plan_node else set()
+    for child in plan_node.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+def _plan_check_cases(db: Session) -> List[Tuple[str, Callable[[], Any], str]]:
+    """(description, the crud call to explain, index its plan must use)."""
+    prefix = PLAN_CHECK_PREFIX
+    flight_ids = (
+        db.execute(
+            text(
+                'SELECT id FROM flights WHERE "airlineCode" = :prefix '
+                "ORDER BY id LIMIT 20"
+            ),
+            {"prefix": prefix},
+        )
+        .scalars()
+        .all()
+    )
+    return [
+        (
+            "flight search by route and dates",
+            lambda: flight.get_flights_with_min_max(
+                db,
+                departure_airport_codes=[f"{prefix}00"],
+                arrival_airport_codes=[f"{prefix}01"],
+                start_date=date(2030, 3, 1),
+                end_date=date(2030, 4, 1),
+                limit=100,
+            ),
+            "ix_flights_route_departureDate",
+        ),
+        (
+            "flight listing by date",
+            lambda: flight.get_flights_with_min_max(
+                db,
+                start_date=date(2030, 6, 1),
+                end_date=date(2030, 6, 3),
+                limit=500,
+            ),
+            "ix_flights_departureDate_id",
+        ),
+        (
+            "cheapest-fare calendar",
+            lambda: flight.get_cheapest_fares_by_day(
+                db,
+                [f"{prefix}00", f"{prefix}02"],
+                [f"{prefix}01"],
+                datetime(2030, 3, 1),
+                datetime(2030, 4, 1),
+            ),
+            "ix_flights_route_departureDate",
+        ),
+        (
+            "price history page",
+            lambda: flight_price_history.get_price_history(db, flight_ids[0], limit=50),
+            "ix_flightPriceHistory_flightId_timestamp_id",
+        ),
+        (
+            "price stats reconciliation",
+            lambda: flight.reconcile_price_stats(db, flight_ids),
+            "ix_flightPriceHistory_flightId_timestamp_id",
+        ),
+        (
+            "triggered subscriptions",
+            lambda: subscription.get_triggered_subscriptions(
+                db, [(flight_id, 1000.0, 0.0) for flight_id in flight_ids]
+            ),
+            "ix_subscriptions_active_flightId_targetPrice",
+        ),
+        (
+            "subscriptions written since the index loaded",
+            lambda: subscription.get_flights_with_subscriptions_written_since(
+                db, datetime.now(timezone.utc).replace(tzinfo=None), flight_ids
+            ),
+            "ix_subscriptions_updatedAt",
+        ),
+    ]
+
+
+def check_query_plans():
+    """
+    Seeds a sizeable dataset, runs ANALYZE and EXPLAINs the statements the hot
+    crud queries issue, failing unless each plan uses the index meant for it.
+    Runs in one transaction that is rolled back, seed data and statistics alike.
+    """
+    db = SessionLocal()
+    failures = []
+    try:
+        _seed_plan_check_data(db)
+        for description, run_query, expected_index in _plan_check_cases(db):
+            with _captured_statements(db) as captured:
+                run_query()
+            statement, parameters = captured[-1]
+            plan = (
+                db.connection()
+                .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                .scalar()
+            )
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            used = _index_names(plan[0]["Plan"])
+            if expected_index in used:
+                logger.info(f"✅ {description}: uses {expected_index}.")
+            else:
+                logger.error(
+                    f"❌ {description}: expected {expected_index}, plan uses {sorted(used) or 'no index'}."
+                )
+                failures.append(description)
+    finally:
+        db.rollback()
+        db.close()
+    if failures:
+        raise SystemExit(f"Query plans missing their index: {', '.join(failures)}")
+
+
+COMMANDS = {
+    "check-query-plans": check_query_plans,
+    "reconcile-price-stats": reconcile_price_stats,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    apply_migrations(engine)
+    COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from app.db.executor import run_db
+from app.services import alert_dispatcher, scraper_service, subscription_index
+
+logger = logging.getLogger(__name__)
+
+SCRAPER_SCHEDULER_ENABLED = (
+    os.getenv("SCRAPER_SCHEDULER_ENABLED", "true").lower() == "true"
+)
+NOUVELAIR_SCRAPE_INTERVAL_MINUTES = int(
+    os.getenv("NOUVELAIR_SCRAPE_INTERVAL_MINUTES", "180")
+)
+TUNISAIR_SCRAPE_INTERVAL_MINUTES = int(
+    os.getenv("TUNISAIR_SCRAPE_INTERVAL_MINUTES", "240")
+)
+SCRAPE_JITTER_SECONDS = int(os.getenv("SCRAPE_JITTER_SECONDS", "300"))
+SCRAPE_MISFIRE_GRACE_SECONDS = int(os.getenv("SCRAPE_MISFIRE_GRACE_SECONDS", "900"))
+SCRAPE_MIN_SPACING_MINUTES = int(os.getenv("SCRAPE_MIN_SPACING_MINUTES", "30"))
+
+SCRAPE_JOBS: Dict[str, Dict[str, Any]] = {
+    "nouvelair": {
+        "func": scraper_service.run_nouvelair_job,
+        "interval_minutes": NOUVELAIR_SCRAPE_INTERVAL_MINUTES,
+    },
+    "tunisair": {
+        "func": scraper_service.run_tunisair_job,
+        "interval_minutes": TUNISAIR_SCRAPE_INTERVAL_MINUTES,
+    },
+}
+
+scheduler = AsyncIOScheduler(
+    job_defaults={
+        "coalesce": True,
+        "max_instances": 1,
+        "misfire_grace_time": SCRAPE_MISFIRE_GRACE_SECONDS,
+    }
+)
+
+_job_locks: Dict[str, asyncio.Lock] = {}
+_job_runs: Dict[str, Dict[str, Any]] = {
+    job_id: {
+        "lastStartedAt": None,
+        "lastFinishedAt": None,
+        "lastStatus": None,
+        "lastError": None,
+    }
+    for job_id in SCRAPE_JOBS
+}
+
+
+async def _run_exclusive(job_id: str):
+    """
+    Runs a scrape job unless another run of it is still in progress. This holds
+    across the interval job and manual triggers, which are separate APScheduler
+    jobs and not covered by max_instances together.
+    """
+    lock = _job_locks.setdefault(job_id, asyncio.Lock())
+    if lock.locked():
+        logger.info(f"Skipping {job_id} scrape: a run is already in progress.")
+        return
+    job: Callable[[], Awaitable[None]] = SCRAPE_JOBS[job_id]["func"]
+    run = _job_runs[job_id]
+    async with lock:
+        run["lastStartedAt"] = datetime.now()
+        try:
+            await job()
+            run["lastStatus"], run["lastError"] = "success", None
+        except Exception as e:
+            run["lastStatus"], run["lastError"] = "failed", str(e)
+            logger.exception(f"Scheduled {job_id} scrape failed.")
+        finally:
+            run["lastFinishedAt"] = datetime.now()
+
+
+def start_scheduler():
+    if SCRAPER_SCHEDULER_ENABLED:
+        for job_id, job in SCRAPE_JOBS.items():
+            scheduler.add_job(
+                _run_exclusive,
+                IntervalTrigger(
+                    minutes=job["interval_minutes"], jitter=SCRAPE_JITTER_SECONDS
+                ),
+                args=[job_id],
+                id=job_id,
+                replace_existing=True,
+            )
+    scheduler.add_job(
+        alert_dispatcher.dispatch_pending_alerts,
+        IntervalTrigger(seconds=alert_dispatcher.ALERT_DISPATCH_INTERVAL_SECONDS),
+        id="alert-dispatch",
+        replace_existing=True,
+    )
+    if subscription_index.SUBSCRIPTION_INDEX_ENABLED:
+        scheduler.add_job(
+            run_db,
+            IntervalTrigger(
+                minutes=subscription_index.SUBSCRIPTION_INDEX_REFRESH_MINUTES
+            ),
+            args=[subscription_index.rebuild],
+            id="subscription-index-refresh",
+            replace_existing=True,
+        )
+    scheduler.start()
+    logger.info(
+        f"Scrape scheduler started ({'interval jobs enabled' if SCRAPER_SCHEDULER_ENABLED else 'manual triggers only'})."
+    )
+
+
+def shutdown_scheduler():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+
+
+def trigger_scrape_jobs() -> Dict[str, str]:
+    """
+    Requests an immediate run of every scrape job. A job that is running, or
+    that started less than SCRAPE_MIN_SPACING_MINUTES ago, is left alone, so
+    repeated triggers never add upstream or DB load.
+    """
+    outcome = {}
+    for job_id in SCRAPE_JOBS:
+        lock = _job_locks.get(job_id)
+        last_started_at = _job_runs[job_id]["lastStartedAt"]
+        if lock is not None and lock.locked():
+            outcome[job_id] = "already running"
+        elif last_started_at and datetime.now() - last_started_at < timedelta(
+            minutes=SCRAPE_MIN_SPACING_MINUTES
+        ):
+            outcome[job_id] = "ran recently"
+        else:
+            scheduler.add_job(
+                _run_exclusive,
+                args=[job_id],
+                id=f"{job_id}-manual",
+                replace_existing=True,
+            )
+            outcome[job_id] = "started"
+    return outcome
+
+
+def get_scheduler_status() -> List[Dict[str, Any]]:
+    status = []
+    for job_id, job in SCRAPE_JOBS.items():
+        scheduled_job = scheduler.get_job(job_id)
+        lock = _job_locks.get(job_id)
+        status.append(
+            {
+                "job": job_id,
+                "intervalMinutes": (
+                    job["interval_minutes"] if scheduled_job is not None else None
+                ),
+                "nextRunTime": (
+                    scheduled_job.next_run_time if scheduled_job is not None else None
+                ),
+                "running": lock is not None and lock.locked(),
+                **_job_runs[job_id],
+            }
+        )
+    return status
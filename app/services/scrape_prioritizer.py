@@ -0,0 +1,111 @@
+import logging
+import math
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.crud import scrape_activity
+from app.crud.scrape_digest import SliceKey
+from app.db import models
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_PRIORITY_WINDOW_DAYS = int(os.getenv("SCRAPE_PRIORITY_WINDOW_DAYS", "14"))
+PRICE_CHANGE_WEIGHT = 1.0
+SUBSCRIPTION_WEIGHT = 2.0
+DEPARTURE_WEIGHT = 3.0
+DEPARTURE_HORIZON_DAYS = 30
+STALENESS_WEIGHT = 1.0
+STALENESS_UNIT_HOURS = float(os.getenv("SCRAPE_PRIORITY_STALENESS_HOURS", "24"))
+ALL_MONTHS = "all"
+
+
+def _days_until_month(month: str, today: date) -> int:
+    if month == ALL_MONTHS:
+        return 0
+    year, month_number = map(int, month.split("-"))
+    return max((date(year, month_number, 1) - today).days, 0)
+
+
+def score_slice(
+    key: SliceKey,
+    activity: scrape_activity.SliceActivity,
+    checked_at: datetime,
+    now: datetime,
+) -> float:
+    """
+    Higher is scraped first. Price volatility and subscriptions count on a log
+    scale, departures within DEPARTURE_HORIZON_DAYS weigh the most, and the
+    staleness term grows without bound so that no slice is starved for good.
+    """
+    days_until_departure = _days_until_month(key[3], now.date())
+    staleness_hours = (now - checked_at).total_seconds() / 3600
+    return (
+        PRICE_CHANGE_WEIGHT * math.log1p(activity.priceChanges)
+        + SUBSCRIPTION_WEIGHT * math.log1p(activity.activeSubscriptions)
+        + DEPARTURE_WEIGHT
+        * DEPARTURE_HORIZON_DAYS
+        / (DEPARTURE_HORIZON_DAYS + days_until_departure)
+        + STALENESS_WEIGHT * staleness_hours / STALENESS_UNIT_HOURS
+    )
+
+
+def _activity_by_slice(
+    activity: Dict[scrape_activity.RouteMonth, scrape_activity.SliceActivity],
+    candidates: List[SliceKey],
+) -> Dict[SliceKey, scrape_activity.SliceActivity]:
+    """Maps the per-month activity onto the candidates, summing it for "all" slices."""
+    by_slice = {}
+    for key in candidates:
+        _, dep, arr, month = key
+        if month != ALL_MONTHS:
+            by_slice[key] = activity.get(
+                (dep, arr, month), scrape_activity.SliceActivity()
+            )
+            continue
+        route_activity = [a for k, a in activity.items() if k[:2] == (dep, arr)]
+        by_slice[key] = scrape_activity.SliceActivity(
+            priceChanges=sum(a.priceChanges for a in route_activity),
+            activeSubscriptions=sum(a.activeSubscriptions for a in route_activity),
+        )
+    return by_slice
+
+
+def prioritize_slices(
+    db: Session,
+    airline_code: str,
+    candidates: List[SliceKey],
+    known_digests: Dict[SliceKey, models.ScrapeDigest],
+    request_budget: int = 0,
+) -> List[SliceKey]:
+    """
+    Orders the candidate slices by score, highest first, and keeps the first
+    `request_budget` of them (all of them when the budget is 0). Slices that
+    were never fetched come before everything else.
+    """
+    now = datetime.now()
+    activity = _activity_by_slice(
+        scrape_activity.get_slice_activity(
+            db, airline_code, now - timedelta(days=SCRAPE_PRIORITY_WINDOW_DAYS)
+        ),
+        candidates,
+    )
+    scores = {
+        key: (
+            score_slice(key, activity[key], known_digests[key].checkedAt, now)
+            if key in known_digests
+            else math.inf
+        )
+        for key in candidates
+    }
+    ranked = sorted(candidates, key=scores.__getitem__, reverse=True)
+    selected = ranked[:request_budget] if request_budget > 0 else ranked
+    logger.info(
+        f"{airline_code}: scraping {len(selected)} of {len(candidates)} slices, "
+        f"scores {scores[selected[0]]:.2f} to {scores[selected[-1]]:.2f}."
+        if selected
+        else f"{airline_code}: no slices to scrape."
+    )
+    return selected
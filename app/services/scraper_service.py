@@ -1,38 +1,73 @@
+import asyncio
+import hashlib
+import json
 import logging
 import os
+import random
 import time
-from datetime import datetime, date
+import uuid
+from datetime import datetime, date, timedelta
+from functools import lru_cache
 from itertools import product
-from typing import List, Dict, Any, Tuple
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Iterable, List, Dict, Any, Optional, Tuple
 
 import httpx
-from bs4 import BeautifulSoup
 from dateutil.relativedelta import relativedelta
+from lxml import etree
 from playwright.async_api import async_playwright
 from sqlalchemy.orm import Session
 
-from app.crud import flight, flight_price_history, airport
+from app.crud import (
+    flight,
+    flight_price_history,
+    airport,
+    scrape_digest,
+    scraper_credential,
+)
 from app.db import models, schemas
+from app.db.executor import run_db
+from app.services import (
+    email_alerts,
+    exchange_rate_service,
+    scrape_prioritizer,
+    subscription_index,
+)
+from app.services.ingest_pipeline import IngestPipeline, ScrapedSlice
 
 logger = logging.getLogger(__name__)
 
+FLIGHT_INGEST_MODE = os.getenv("FLIGHT_INGEST_MODE", "upsert")
+SCRAPE_DIGEST_MAX_AGE_HOURS = float(os.getenv("SCRAPE_DIGEST_MAX_AGE_HOURS", "24"))
+
 NOUVELAIR_AVAILABILITY_API = "https://webapi.nouvelair.com/api/reservation/availability"
 NOUVELAIR_URL = "https://www.nouvelair.com/"
 NOUVELAIR_CURRENCY_ID = 2
 NOUVELAIR_AIRLINE_CODE = "BJ"
+NOUVELAIR_CONCURRENCY = int(os.getenv("NOUVELAIR_CONCURRENCY", "4"))
+NOUVELAIR_REQUEST_DELAY_SECONDS = float(
+    os.getenv("NOUVELAIR_REQUEST_DELAY_SECONDS", "1")
+)
+NOUVELAIR_API_KEY_CREDENTIAL = "nouvelair_api_key"
+NOUVELAIR_API_KEY_TTL_HOURS = float(os.getenv("NOUVELAIR_API_KEY_TTL_HOURS", "24"))
+NOUVELAIR_SEARCH_MONTH = "all"
+NOUVELAIR_REQUEST_BUDGET = int(os.getenv("NOUVELAIR_REQUEST_BUDGET", "0"))
 nouvelair_api_key: str | None = None
 
 TUNISAIR_BASE_URL_DE = "https://flights.tunisair.com/en-de/prices/per-day"
 TUNISAIR_BASE_URL_BE = "https://flights.tunisair.com/en-be/prices/per-day"
 TUNISAIR_BASE_URL_TN = "https://flights.tunisair.com/en-tn/prices/per-day"
-TUNISAIR_EXCHANGE_RATE_API_URL = (
-    "https://v6.exchangerate-api.com/v6/{api_key}/latest/TND"
-)
 TUNISAIR_AIRLINE_CODE = "TU"
 TUNISAIR_MONTHS_TO_SEARCH = 4
 TUNISAIR_DEFAULT_TRIP_TYPE = "O"
 TUNISAIR_DEFAULT_TRIP_DURATION = "0"
 TUNISAIR_REQUEST_RETRIES = 3
+TUNISAIR_CONCURRENCY = int(os.getenv("TUNISAIR_CONCURRENCY", "6"))
+TUNISAIR_REQUEST_DELAY_SECONDS = float(
+    os.getenv("TUNISAIR_REQUEST_DELAY_SECONDS", "0.5")
+)
+TUNISAIR_RETRY_BASE_DELAY_SECONDS = 0.5
+TUNISAIR_REQUEST_BUDGET = int(os.getenv("TUNISAIR_REQUEST_BUDGET", "0"))
 
 TUNISAIR_VALID_ROUTES_DE_TO_TN: List[Tuple[str, str]] = [
     ("MUC", "TUN"),
@@ -54,60 +89,209 @@ TUNISAIR_VALID_ROUTES_TN_TO_DE: List[Tuple[str, str]] = [
 ]
 
 
-def process_scraped_flights(db: Session, payload: schemas.ScrapedDataPayload):
-    updated_flights_for_alerting = []
-    new_flights_count = 0
-    updated_prices_count = 0
-
-    for scraped_flight in payload.flights:
-        existing_flight = (
-            db.query(models.Flight)
-            .filter(
-                models.Flight.departureDate == scraped_flight.departureDate,
-                models.Flight.departureAirportCode
-                == scraped_flight.departureAirportCode,
-                models.Flight.arrivalAirportCode == scraped_flight.arrivalAirportCode,
-                models.Flight.airlineCode == scraped_flight.airlineCode,
-            )
-            .first()
-        )
-        now = datetime.now()
+def _flight_natural_key(f) -> flight.FlightNaturalKey:
+    return (
+        f.departureDate,
+        f.departureAirportCode,
+        f.arrivalAirportCode,
+        f.airlineCode,
+    )
+
+
+def _use_native_upsert(db: Session) -> bool:
+    return FLIGHT_INGEST_MODE == "upsert" and db.get_bind().dialect.name == "postgresql"
+
+
+def _new_flight_row(scraped_flight: schemas.ScrapedFlight, now: datetime) -> dict:
+    return {
+        **scraped_flight.model_dump(),
+        "minPriceEur": scraped_flight.priceEur,
+        "maxPriceEur": scraped_flight.priceEur,
+        "lastChangedAt": now,
+    }
+
+
+def _write_flights_with_upsert(db: Session, scraped_by_key: dict, now: datetime):
+    created_flights = []
+    price_updates = []
+    for row in flight.upsert_flights(
+        db, [_new_flight_row(f, now) for f in scraped_by_key.values()]
+    ):
+        change = {"id": row.id, "price": row.price, "priceEur": row.priceEur}
+        if row.inserted:
+            created_flights.append(change)
+        else:
+            price_updates.append({**change, "old_price_eur": row.oldPriceEur})
+    return created_flights, price_updates
+
+
+def _write_flights_in_bulk(db: Session, scraped_by_key: dict, now: datetime):
+    existing_by_key = {
+        _flight_natural_key(f): f
+        for f in flight.get_flights_by_natural_keys(db, list(scraped_by_key))
+    }
+    new_flight_rows = []
+    price_updates = []
+    for key, scraped_flight in scraped_by_key.items():
+        existing_flight = existing_by_key.get(key)
         if not existing_flight:
-            new_flight_db = flight.create_flight(
-                db, flight=schemas.FlightCreate(**scraped_flight.model_dump())
+            new_flight_rows.append(_new_flight_row(scraped_flight, now))
+        elif (
+            abs(float(existing_flight.price) - float(scraped_flight.price))
+            > flight.PRICE_CHANGE_TOLERANCE
+        ):
+            price_updates.append(
+                {
+                    "id": existing_flight.id,
+                    "price": scraped_flight.price,
+                    "priceEur": scraped_flight.priceEur,
+                    "old_price_eur": existing_flight.priceEur,
+                }
             )
-            new_flights_count += 1
-            history_data = schemas.FlightPriceHistoryCreate(
-                flightId=new_flight_db.id,
-                price=scraped_flight.price,
-                priceEur=scraped_flight.priceEur,
-                timestamp=now,
+    flight.bulk_update_flight_prices(db, price_updates, now)
+    created_flights = [
+        {"id": row.id, "price": row.price, "priceEur": row.priceEur}
+        for row in flight.bulk_create_flights(db, new_flight_rows)
+    ]
+    return created_flights, price_updates
+
+
+def process_scraped_flights(
+    db: Session, payload: schemas.ScrapedDataPayload, run_id: Optional[str] = None
+):
+    """
+    Ingests a scrape payload in a single transaction. Flights are written either
+    with a native ON CONFLICT upsert (FLIGHT_INGEST_MODE=upsert on Postgres) or by
+    loading existing flights in bulk and diffing prices in memory; history rows
+    for new and re-priced flights follow in one batched INSERT, and price alerts
+    they trigger are queued in the outbox within the same transaction, tagged
+    with the scrape run `run_id`.
+    """
+    scraped_by_key = {_flight_natural_key(f): f for f in payload.flights}
+    now = datetime.now()
+    try:
+        if _use_native_upsert(db):
+            created_flights, price_updates = _write_flights_with_upsert(
+                db, scraped_by_key, now
             )
-            flight_price_history.create_price_history(db, history_data)
         else:
-            if abs(float(existing_flight.price) - float(scraped_flight.price)) > 0.01:
-                old_price_eur = existing_flight.priceEur
-                update_data = schemas.FlightUpdate(
-                    price=scraped_flight.price, priceEur=scraped_flight.priceEur
-                )
-                flight.update_flight(
-                    db, flight_id=existing_flight.id, flight_update=update_data
-                )
-                updated_prices_count += 1
-                history_data = schemas.FlightPriceHistoryCreate(
-                    flightId=existing_flight.id,
-                    price=scraped_flight.price,
-                    priceEur=scraped_flight.priceEur,
-                    timestamp=now,
-                )
-                flight_price_history.create_price_history(db, history_data)
-                updated_flights_for_alerting.append(
-                    {"flight": existing_flight, "old_price_eur": old_price_eur}
-                )
+            created_flights, price_updates = _write_flights_in_bulk(
+                db, scraped_by_key, now
+            )
+        flight_price_history.bulk_create_price_history(
+            db,
+            [
+                {
+                    "flightId": f["id"],
+                    "price": f["price"],
+                    "priceEur": f["priceEur"],
+                    "timestamp": now,
+                }
+                for f in created_flights + price_updates
+            ],
+        )
+        alerted_subscription_ids = email_alerts.enqueue_price_alerts(
+            db, price_updates, now, run_id
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    subscription_index.discard(alerted_subscription_ids)
+
     logger.info(
-        f"Processed report: {new_flights_count} new flights, {updated_prices_count} updated prices."
+        f"Processed report: {len(created_flights)} new flights, {len(price_updates)} updated prices."
+    )
+
+
+def _response_digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def _is_unchanged_slice(
+    known_digests: Dict[scrape_digest.SliceKey, models.ScrapeDigest],
+    key: scrape_digest.SliceKey,
+    digest: str,
+) -> bool:
+    """
+    A slice is skipped when its digest matches the last ingested response, unless
+    that ingestion is older than SCRAPE_DIGEST_MAX_AGE_HOURS and due for a refresh.
+    """
+    known = known_digests.get(key)
+    return bool(
+        known
+        and known.digest == digest
+        and datetime.now() - known.processedAt
+        < timedelta(hours=SCRAPE_DIGEST_MAX_AGE_HOURS)
     )
-    return updated_flights_for_alerting
+
+
+def _build_slice(
+    known_digests: Dict[scrape_digest.SliceKey, models.ScrapeDigest],
+    key: scrape_digest.SliceKey,
+    digest: str,
+    parse: Callable[[], List[schemas.ScrapedFlight]],
+) -> ScrapedSlice:
+    if _is_unchanged_slice(known_digests, key, digest):
+        return ScrapedSlice(key, digest, None)
+    return ScrapedSlice(key, digest, parse())
+
+
+def _flush_slices(db: Session, slices: List[ScrapedSlice], run_id: str):
+    """Ingests one chunk of scrape run `run_id`, then records the digests it covered."""
+    changed_slices = [s for s in slices if s.flights is not None]
+    process_scraped_flights(
+        db,
+        schemas.ScrapedDataPayload(
+            flights=[f for s in changed_slices for f in s.flights or []]
+        ),
+        run_id,
+    )
+    now = datetime.now()
+    scrape_digest.save_digests(db, [(s.key, s.digest) for s in changed_slices], now)
+    scrape_digest.touch_digests(db, [s.key for s in slices if s.flights is None], now)
+
+
+async def _run_fetchers(fetches: Iterable[Awaitable[Any]]) -> List[Any]:
+    """
+    Runs the fetches as sibling tasks and returns their results in order. The
+    first failure cancels and awaits the others before it is re-raised, so no
+    fetch outlives the run's HTTP client, ingest pipeline or job lock.
+    """
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(fetch) for fetch in fetches]
+    except ExceptionGroup as failures:
+        first = failures.exceptions[0]
+        # Producers blocked on a failed writer all re-raise its one exception.
+        for other in failures.exceptions[1:]:
+            if other is not first:
+                logger.warning(f"Fetch also failed while the run aborted: {other!r}")
+        raise first
+    return [task.result() for task in tasks]
+
+
+@asynccontextmanager
+async def _ingest_pipeline(airline_name: str):
+    run_id = uuid.uuid4().hex
+
+    async def flush(slices: List[ScrapedSlice]):
+        await run_db(_flush_slices, slices, run_id)
+
+    pipeline = IngestPipeline(flush)
+    try:
+        async with pipeline:
+            yield pipeline
+    except Exception as e:
+        logger.critical(
+            f"A fatal error occurred while reporting {airline_name} data. Run aborted. Error: {e}"
+        )
+        raise
+    finally:
+        logger.info(
+            f"{airline_name}: ingested {pipeline.slices_count} slices in {pipeline.flushed_chunks_count} chunks, "
+            f"skipped {pipeline.skipped_slices_count} unchanged since the last run."
+        )
 
 
 async def _nouvelair_capture_api_key():
@@ -145,6 +329,43 @@ async def _nouvelair_capture_api_key():
         logger.error("Failed to capture Nouvelair API key within the time limit.")
 
 
+async def _ensure_nouvelair_api_key(force_refresh: bool = False):
+    """
+    Loads the Nouvelair API key from the credential cache and only launches the
+    headless browser when there is no key, it is older than
+    NOUVELAIR_API_KEY_TTL_HOURS, or `force_refresh` is set after a rejection.
+    """
+    global nouvelair_api_key
+    cached = await run_db(
+        scraper_credential.get_credential, NOUVELAIR_API_KEY_CREDENTIAL
+    )
+    if (
+        cached
+        and not force_refresh
+        and datetime.now() - cached.fetchedAt
+        < timedelta(hours=NOUVELAIR_API_KEY_TTL_HOURS)
+    ):
+        nouvelair_api_key = cached.value
+        logger.info("Using cached Nouvelair API key.")
+        return
+
+    nouvelair_api_key = None
+    await _nouvelair_capture_api_key()
+    if nouvelair_api_key:
+        await run_db(
+            scraper_credential.save_credential,
+            NOUVELAIR_API_KEY_CREDENTIAL,
+            nouvelair_api_key,
+        )
+    elif cached and not force_refresh:
+        logger.warning("Falling back to the expired cached Nouvelair API key.")
+        nouvelair_api_key = cached.value
+
+
+class NouvelairAuthError(Exception):
+    pass
+
+
 async def _get_nouvelair_flight_availability(
     session: httpx.AsyncClient, dep_code: str, dest_code: str
 ) -> List[Dict[str, Any]]:
@@ -163,22 +384,102 @@ async def _get_nouvelair_flight_availability(
         res = await session.get(
             NOUVELAIR_AVAILABILITY_API, params=params, headers=headers, timeout=20
         )
+        if res.status_code in (401, 403):
+            raise NouvelairAuthError(
+                f"Nouvelair rejected the API key for {dep_code}->{dest_code} ({res.status_code})."
+            )
         res.raise_for_status()
         return res.json().get("data", [])
-    except httpx.RequestError as e:
+    except httpx.HTTPError as e:
         logger.error(
             f"Error fetching Nouvelair availability for {dep_code}->{dest_code}: {e}"
         )
         return []
 
 
-async def run_nouvelair_job(db: Session):
+async def _scrape_nouvelair_route(
+    session: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    pipeline: IngestPipeline,
+    known_digests: Dict[scrape_digest.SliceKey, models.ScrapeDigest],
+    dep_code: str,
+    arr_code: str,
+) -> bool:
+    """Streams the route's slice into the pipeline; False if the API key was rejected."""
+    async with semaphore:
+        try:
+            flights_data = await _get_nouvelair_flight_availability(
+                session, dep_code, arr_code
+            )
+        except NouvelairAuthError as e:
+            logger.warning(str(e))
+            return False
+        finally:
+            # Keep each slot paced so the upstream sees at most
+            # NOUVELAIR_CONCURRENCY requests per NOUVELAIR_REQUEST_DELAY_SECONDS.
+            await asyncio.sleep(NOUVELAIR_REQUEST_DELAY_SECONDS)
+    await pipeline.put(
+        _build_slice(
+            known_digests,
+            (NOUVELAIR_AIRLINE_CODE, dep_code, arr_code, NOUVELAIR_SEARCH_MONTH),
+            _response_digest(json.dumps(flights_data, sort_keys=True)),
+            lambda: _parse_nouvelair_flights(dep_code, arr_code, flights_data),
+        )
+    )
+    return True
+
+
+async def _scrape_nouvelair_routes(
+    session: httpx.AsyncClient,
+    pipeline: IngestPipeline,
+    known_digests: Dict[scrape_digest.SliceKey, models.ScrapeDigest],
+    routes: List[Tuple[str, str]],
+) -> List[Tuple[str, str]]:
+    """Scrapes the routes concurrently and returns those whose API key was rejected."""
+    semaphore = asyncio.Semaphore(NOUVELAIR_CONCURRENCY)
+    accepted = await _run_fetchers(
+        _scrape_nouvelair_route(
+            session, semaphore, pipeline, known_digests, dep_code, arr_code
+        )
+        for dep_code, arr_code in routes
+    )
+    return [route for route, ok in zip(routes, accepted) if not ok]
+
+
+def _parse_nouvelair_flights(
+    dep_code: str, arr_code: str, flights_data: List[Dict[str, Any]]
+) -> List[schemas.ScrapedFlight]:
+    scraped_flights = []
+    for f in flights_data:
+        try:
+            price = float(f["price"])
+            if price <= 0:
+                continue
+            departure_date = datetime.strptime(f["date"], "%Y-%m-%d")
+            scraped_flights.append(
+                schemas.ScrapedFlight(
+                    departureDate=departure_date,
+                    price=price,
+                    priceEur=price,
+                    departureAirportCode=dep_code,
+                    arrivalAirportCode=arr_code,
+                    airlineCode=NOUVELAIR_AIRLINE_CODE,
+                )
+            )
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(
+                f"Skipping malformed Nouvelair flight record: {f}. Error: {e}"
+            )
+    return scraped_flights
+
+
+async def run_nouvelair_job():
     logger.info("--- Starting Nouvelair scraper run ---")
-    await _nouvelair_capture_api_key()
+    await _ensure_nouvelair_api_key()
     if not nouvelair_api_key:
         logger.critical("Nouvelair scraper run aborted: Could not obtain API key.")
         return
-    airports_list = airport.get_airports(db)
+    airports_list = await run_db(airport.get_airports)
     if not airports_list:
         logger.critical(
             "Nouvelair scraper run aborted: Could not fetch airport list from backend."
@@ -189,114 +490,96 @@ async def run_nouvelair_job(db: Session):
     routes = list(product(tunisian_airports, german_airports)) + list(
         product(german_airports, tunisian_airports)
     )
+    known_digests = await run_db(scrape_digest.get_digests, NOUVELAIR_AIRLINE_CODE)
+    routes = [
+        (dep_code, arr_code)
+        for _, dep_code, arr_code, _ in await run_db(
+            scrape_prioritizer.prioritize_slices,
+            NOUVELAIR_AIRLINE_CODE,
+            [
+                (NOUVELAIR_AIRLINE_CODE, dep_code, arr_code, NOUVELAIR_SEARCH_MONTH)
+                for dep_code, arr_code in routes
+            ],
+            known_digests,
+            NOUVELAIR_REQUEST_BUDGET,
+        )
+    ]
     logger.info("--- Starting Nouvelair scraping for routes ---")
-    scraped_data_payload = schemas.ScrapedDataPayload(flights=[])
 
-    async with httpx.AsyncClient() as session:
-        for dep_code, arr_code in routes:
-            for f in await _get_nouvelair_flight_availability(
-                session, dep_code, arr_code
-            ):
-                try:
-                    price = float(f["price"])
-                    if price <= 0:
-                        continue
-                    departure_date = datetime.strptime(f["date"], "%Y-%m-%d")
-                    scraped_data_payload.flights.append(
-                        schemas.ScrapedFlight(
-                            departureDate=departure_date,
-                            price=price,
-                            priceEur=price,
-                            departureAirportCode=dep_code,
-                            arrivalAirportCode=arr_code,
-                            airlineCode=NOUVELAIR_AIRLINE_CODE,
-                        )
-                    )
-                except (ValueError, TypeError, KeyError) as e:
-                    logger.warning(
-                        f"Skipping malformed Nouvelair flight record: {f}. Error: {e}"
-                    )
-            time.sleep(
-                1
-            )  # Consider removing or making this async if performance is critical
-
-    try:
-        process_scraped_flights(db, scraped_data_payload)
-    except Exception as e:
-        logger.critical(
-            f"A fatal error occurred while reporting Nouvelair data. Run aborted. Error: {e}"
+    async with httpx.AsyncClient() as session, _ingest_pipeline(
+        "Nouvelair"
+    ) as pipeline:
+        rejected_routes = await _scrape_nouvelair_routes(
+            session, pipeline, known_digests, routes
         )
-        raise
+        if rejected_routes:
+            logger.warning(
+                f"Nouvelair API key rejected on {len(rejected_routes)} routes. Refreshing it and retrying them."
+            )
+            await _ensure_nouvelair_api_key(force_refresh=True)
+            if nouvelair_api_key:
+                await _scrape_nouvelair_routes(
+                    session, pipeline, known_digests, rejected_routes
+                )
     logger.info("--- Nouvelair scraper run finished successfully ---")
 
 
-async def _get_tunisair_exchange_rate(session: httpx.AsyncClient) -> float:
-    api_key = os.getenv("EXCHANGE_RATE_API_KEY")
-    fallback_eur_rate = 0.29
-    if not api_key:
-        logger.warning(
-            f"EXCHANGE_RATE_API_KEY not found. Using fallback rate: 1 TND = {fallback_eur_rate:.4f} EUR"
-        )
-        return fallback_eur_rate
-    url = TUNISAIR_EXCHANGE_RATE_API_URL.format(api_key=api_key)
-    for attempt in range(TUNISAIR_REQUEST_RETRIES):
-        try:
-            response = await session.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("result") == "success":
-                rate = data["conversion_rates"]["EUR"]
-                logger.info(
-                    f"Successfully fetched exchange rate: 1 TND = {rate:.4f} EUR"
-                )
-                return rate
-        except httpx.RequestError as e:
-            logger.warning(
-                f"Attempt {attempt + 1}/{TUNISAIR_REQUEST_RETRIES} to fetch exchange rate failed: {e}"
-            )
-            if attempt < TUNISAIR_REQUEST_RETRIES - 1:
-                time.sleep(1)
-    logger.error(
-        f"Failed to fetch exchange rate after {TUNISAIR_REQUEST_RETRIES} attempts. Using fallback."
-    )
-    return fallback_eur_rate
+async def _tunisair_backoff(attempt: int):
+    """Exponential backoff with jitter: base * 2^attempt plus up to the same again."""
+    delay = TUNISAIR_RETRY_BASE_DELAY_SECONDS * 2**attempt
+    await asyncio.sleep(delay + random.uniform(0, delay))
+
+
+_TUNISAIR_AVAILABLE_DAYS = etree.XPath(
+    "//td[contains(concat(' ', normalize-space(@class), ' '), ' available ')]"
+)
+_TUNISAIR_PRICE_DIVS = etree.XPath(
+    ".//div[contains(concat(' ', normalize-space(@class), ' '), ' val_price_offre ')]"
+)
+_TUNISAIR_PRICE_CLEANUP = str.maketrans({" ": None, ",": "."})
+
+
+@lru_cache(maxsize=1024)
+def _parse_tunisair_date(date_str: str) -> datetime:
+    return datetime.strptime(date_str, "%Y-%m-%d")
 
 
 def _extract_tunisair_prices(
     html: str, is_eur_native: bool, conversion_rate: float
 ) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html, "html.parser")
+    """
+    Extracts {"departureDate", "price", "priceEur"} from a per-day calendar view:
+    every td.available[data-departure] with a non-empty div.val_price_offre price
+    in the route's native currency. Parsed with libxml2 XPath rather than a full
+    BeautifulSoup tree; benchmarks/tunisair_extract.py checks both agree.
+    """
+    root = etree.HTML(html)
+    if root is None:
+        return []
+    currency = "EUR" if is_eur_native else "TND"
     found_flights = []
-    for td in soup.find_all("td", class_="available"):
+    for td in _TUNISAIR_AVAILABLE_DAYS(root):
         date_str = td.get("data-departure")
-        price_div = td.find("div", class_="val_price_offre")
-        if not (
-            date_str
-            and price_div
-            and (price_text := price_div.get_text(strip=True))
-            and price_text != "-"
-        ):
+        price_divs = _TUNISAIR_PRICE_DIVS(td)
+        if not (date_str and price_divs):
+            continue
+        price_text = "".join(text.strip() for text in price_divs[0].itertext())
+        if not price_text or price_text == "-" or currency not in price_text:
             continue
         try:
-            departure_date = datetime.strptime(date_str, "%Y-%m-%d")
-            flight_data = {}
-            if is_eur_native and "EUR" in price_text:
-                price_str = (
-                    price_text.replace(" ", "").replace(",", ".").replace("EUR", "")
-                )
-                price_val = round(float(price_str), 2)
+            departure_date = _parse_tunisair_date(date_str)
+            price_val = float(
+                price_text.translate(_TUNISAIR_PRICE_CLEANUP).replace(currency, "")
+            )
+            if is_eur_native:
+                price_val = round(price_val, 2)
                 flight_data = {"price": price_val, "priceEur": price_val}
-            elif not is_eur_native and "TND" in price_text:
-                price_str = (
-                    price_text.replace(" ", "").replace(",", ".").replace("TND", "")
-                )
-                price_tnd = round(float(price_str), 3)
+            else:
+                price_val = round(price_val, 3)
                 flight_data = {
-                    "price": price_tnd,
-                    "priceEur": round(price_tnd * conversion_rate, 2),
+                    "price": price_val,
+                    "priceEur": round(price_val * conversion_rate, 2),
                 }
-            else:
-                continue
             flight_data["departureDate"] = departure_date
             found_flights.append(flight_data)
         except (ValueError, TypeError) as e:
@@ -306,108 +589,155 @@ def _extract_tunisair_prices(
     return found_flights
 
 
-async def _scrape_tunisair_route(
+async def _fetch_tunisair_month(
     session: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    base_url: str,
     dep_code: str,
     arr_code: str,
-    is_eur_native: bool,
-    conversion_rate: float = 1.0,
-) -> List[Dict[str, Any]]:
-    base_url = TUNISAIR_BASE_URL_TN
-    if is_eur_native:
-        base_url = TUNISAIR_BASE_URL_BE if dep_code == "BRU" else TUNISAIR_BASE_URL_DE
-
-    route_flights = []
-    today = date.today()
-    search_dates = [today.strftime("%Y-%m-%d")] + [
-        (today + relativedelta(months=i)).strftime("%Y-%m-01")
-        for i in range(1, TUNISAIR_MONTHS_TO_SEARCH)
-    ]
-    for search_date in search_dates:
-        params = {
-            "date": search_date,
-            "from": dep_code,
-            "to": arr_code,
-            "tripDuration": TUNISAIR_DEFAULT_TRIP_DURATION,
-            "tripType": TUNISAIR_DEFAULT_TRIP_TYPE,
-        }
-        html_view = None
+    search_date: str,
+) -> Optional[str]:
+    params = {
+        "date": search_date,
+        "from": dep_code,
+        "to": arr_code,
+        "tripDuration": TUNISAIR_DEFAULT_TRIP_DURATION,
+        "tripType": TUNISAIR_DEFAULT_TRIP_TYPE,
+    }
+    html_view = None
+    async with semaphore:
         for attempt in range(TUNISAIR_REQUEST_RETRIES):
             try:
                 response = await session.get(base_url, params=params, timeout=20)
                 response.raise_for_status()
                 html_view = response.json().get("view", "")
                 break
-            except httpx.RequestError as e:
+            except httpx.HTTPError as e:
                 logger.warning(
                     f"Attempt {attempt + 1}/{TUNISAIR_REQUEST_RETRIES} failed for Tunisair {dep_code}->{arr_code} on {search_date}: {e}"
                 )
                 if attempt < TUNISAIR_REQUEST_RETRIES - 1:
-                    time.sleep(1)
+                    await _tunisair_backoff(attempt)
+        await asyncio.sleep(TUNISAIR_REQUEST_DELAY_SECONDS)
+    if not html_view:
+        logger.error(
+            f"Failed to fetch Tunisair data for {dep_code}->{arr_code} on {search_date} after retries."
+        )
+    return html_view
 
-        if html_view:
-            extracted_flights = _extract_tunisair_prices(
-                html_view, is_eur_native, conversion_rate
-            )
-            for flight_data in extracted_flights:
-                flight_data["departureAirportCode"] = dep_code
-                flight_data["arrivalAirportCode"] = arr_code
-            route_flights.extend(extracted_flights)
-        else:
-            logger.error(
-                f"Failed to fetch Tunisair data for {dep_code}->{arr_code} on {search_date} after retries."
-            )
-        time.sleep(0.5)
-    return route_flights
 
+def _tunisair_search_dates() -> List[str]:
+    today = date.today()
+    return [today.strftime("%Y-%m-%d")] + [
+        (today + relativedelta(months=i)).strftime("%Y-%m-01")
+        for i in range(1, TUNISAIR_MONTHS_TO_SEARCH)
+    ]
 
-async def run_tunisair_job(db: Session):
-    logger.info("--- Starting Tunisair scraper run ---")
 
-    all_scraped_flights = []
+async def _scrape_tunisair_slice(
+    session: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    pipeline: IngestPipeline,
+    known_digests: Dict[scrape_digest.SliceKey, models.ScrapeDigest],
+    dep_code: str,
+    arr_code: str,
+    search_date: str,
+    is_eur_native: bool,
+    conversion_rate: Optional[Awaitable[float]] = None,
+):
+    """
+    Fetches one route/month view under the shared semaphore and streams it into
+    the pipeline. TND-native views only wait for `conversion_rate` once fetched,
+    so the rate lookup overlaps with the crawl; the rate is part of their digest
+    since it changes the converted prices.
+    """
+    base_url = TUNISAIR_BASE_URL_TN
+    if is_eur_native:
+        base_url = TUNISAIR_BASE_URL_BE if dep_code == "BRU" else TUNISAIR_BASE_URL_DE
 
-    async with httpx.AsyncClient() as session:
-        logger.info(
-            "--- Scraping Tunisair flights from Germany to Tunisia (EUR native) ---"
+    html_view = await _fetch_tunisair_month(
+        session, semaphore, base_url, dep_code, arr_code, search_date
+    )
+    if not html_view:
+        return
+    rate = await conversion_rate if conversion_rate is not None else 1.0
+
+    await pipeline.put(
+        _build_slice(
+            known_digests,
+            (TUNISAIR_AIRLINE_CODE, dep_code, arr_code, search_date[:7]),
+            _response_digest(html_view, "" if is_eur_native else repr(rate)),
+            lambda: [
+                schemas.ScrapedFlight(
+                    departureDate=flight_data["departureDate"],
+                    price=flight_data["price"],
+                    priceEur=flight_data["priceEur"],
+                    departureAirportCode=dep_code,
+                    arrivalAirportCode=arr_code,
+                    airlineCode=TUNISAIR_AIRLINE_CODE,
+                )
+                for flight_data in _extract_tunisair_prices(
+                    html_view, is_eur_native, rate
+                )
+            ],
         )
-        for dep, arr in TUNISAIR_VALID_ROUTES_DE_TO_TN:
-            all_scraped_flights.extend(
-                await _scrape_tunisair_route(session, dep, arr, is_eur_native=True)
-            )
+    )
 
-        logger.info(
-            "--- Scraping Tunisair flights from Tunisia to Germany (TND native) ---"
-        )
-        conversion_rate = await _get_tunisair_exchange_rate(session)
-        for dep, arr in TUNISAIR_VALID_ROUTES_TN_TO_DE:
-            all_scraped_flights.extend(
-                await _scrape_tunisair_route(
+
+async def run_tunisair_job():
+    logger.info("--- Starting Tunisair scraper run ---")
+    known_digests = await run_db(scrape_digest.get_digests, TUNISAIR_AIRLINE_CODE)
+    search_dates = {
+        search_date[:7]: search_date for search_date in _tunisair_search_dates()
+    }
+    slices = await run_db(
+        scrape_prioritizer.prioritize_slices,
+        TUNISAIR_AIRLINE_CODE,
+        [
+            (TUNISAIR_AIRLINE_CODE, dep, arr, month)
+            for dep, arr in TUNISAIR_VALID_ROUTES_DE_TO_TN
+            + TUNISAIR_VALID_ROUTES_TN_TO_DE
+            for month in search_dates
+        ],
+        known_digests,
+        TUNISAIR_REQUEST_BUDGET,
+    )
+    eur_native_routes = set(TUNISAIR_VALID_ROUTES_DE_TO_TN)
+    logger.info(
+        f"--- Scraping {len(slices)} Tunisair route/month views, highest priority first ---"
+    )
+
+    # The semaphore wakes waiters in FIFO order, so slices are fetched in the
+    # prioritized order.
+    semaphore = asyncio.Semaphore(TUNISAIR_CONCURRENCY)
+    async with httpx.AsyncClient() as session, _ingest_pipeline("Tunisair") as pipeline:
+        conversion_rate = None
+        if any((dep, arr) not in eur_native_routes for _, dep, arr, _ in slices):
+            conversion_rate = asyncio.create_task(
+                exchange_rate_service.get_exchange_rate("TND", "EUR", session=session)
+            )
+        try:
+            await _run_fetchers(
+                _scrape_tunisair_slice(
                     session,
+                    semaphore,
+                    pipeline,
+                    known_digests,
                     dep,
                     arr,
-                    is_eur_native=False,
-                    conversion_rate=conversion_rate,
+                    search_dates[month],
+                    is_eur_native=(dep, arr) in eur_native_routes,
+                    conversion_rate=(
+                        None if (dep, arr) in eur_native_routes else conversion_rate
+                    ),
                 )
+                for _, dep, arr, month in slices
             )
-
-    scraped_data_payload = schemas.ScrapedDataPayload(flights=[])
-    for flight_dict in all_scraped_flights:
-        scraped_data_payload.flights.append(
-            schemas.ScrapedFlight(
-                departureDate=flight_dict["departureDate"],
-                price=flight_dict["price"],
-                priceEur=flight_dict["priceEur"],
-                departureAirportCode=flight_dict["departureAirportCode"],
-                arrivalAirportCode=flight_dict["arrivalAirportCode"],
-                airlineCode=TUNISAIR_AIRLINE_CODE,
-            )
-        )
-
-    try:
-        process_scraped_flights(db, scraped_data_payload)
-    except Exception as e:
-        logger.critical(
-            f"A fatal error occurred while reporting Tunisair data. Run aborted. Error: {e}"
-        )
-        raise
+        finally:
+            # Only fetched TND slices await the rate; when none was (every fetch
+            # failed, or the run aborted), stop the lookup while the client is
+            # still open and retrieve its outcome.
+            if conversion_rate is not None:
+                conversion_rate.cancel()
+                await asyncio.gather(conversion_rate, return_exceptions=True)
     logger.info("--- Tunisair scraper run finished successfully ---")
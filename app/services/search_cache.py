@@ -0,0 +1,57 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))
+
+# key -> (generation, storedAt, value), least recently used first.
+_entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _is_hashable(key: Hashable) -> bool:
+    try:
+        hash(key)
+    except TypeError:
+        return False
+    return True
+
+
+def get(key: Hashable, generation: int) -> Optional[Any]:
+    """
+    The value cached for `key` at `generation`, the flights table version read
+    for this request, which moves with every committed write to the table.
+    """
+    if not SEARCH_CACHE_ENABLED or not _is_hashable(key):
+        return None
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        entry_generation, stored_at, value = entry
+        if entry_generation != generation or (
+            SEARCH_CACHE_TTL_SECONDS > 0
+            and time.monotonic() - stored_at > SEARCH_CACHE_TTL_SECONDS
+        ):
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return value
+
+
+def put(key: Hashable, value: Any, generation: int):
+    """
+    Caches `value`, queried after `generation` was read. A write committed in
+    between has already moved the version, so the entry is never served.
+    """
+    if not SEARCH_CACHE_ENABLED or not _is_hashable(key):
+        return
+    with _lock:
+        _entries[key] = (generation, time.monotonic(), value)
+        _entries.move_to_end(key)
+        while len(_entries) > SEARCH_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTION_INDEX_ENABLED = (
+    os.getenv("SUBSCRIPTION_INDEX_ENABLED", "true").lower() == "true"
+)
+SUBSCRIPTION_INDEX_REFRESH_MINUTES = int(
+    os.getenv("SUBSCRIPTION_INDEX_REFRESH_MINUTES", "10")
+)
+# How long a subscription write may take between setting its row's updatedAt
+# and committing; see loaded_before.
+SUBSCRIPTION_INDEX_WRITE_GRACE_SECONDS = float(
+    os.getenv("SUBSCRIPTION_INDEX_WRITE_GRACE_SECONDS", "60")
+)
+
+# flightId -> sorted (targetPrice, subscriptionId) of its active subscriptions.
+_targets: Dict[int, List[Tuple[float, int]]] = {}
+# subscriptionId -> (flightId, targetPrice), to find an entry when it changes.
+_entries: Dict[int, Tuple[int, float]] = {}
+_lock = threading.Lock()
+_ready = False
+# Subscriptions with an older updatedAt are in the index as loaded.
+_loaded_before: Optional[datetime] = None
+# Changes made while a rebuild is reading the table, as (subscriptionId, new
+# (flightId, targetPrice) or None when removed), replayed onto its result.
+_changes_during_rebuild: List[Tuple[int, Optional[Tuple[int, float]]]] = []
+_rebuilds_in_progress = 0
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def loaded_before() -> Optional[datetime]:
+    """
+    Subscriptions whose updatedAt is older than this are in the index; younger
+    ones may be written by another process (or SQL) after the last rebuild read
+    the table and are to be matched in the database. None until the first
+    rebuild.
+    """
+    return _loaded_before
+
+
+def _set_locked(sub_id: int, entry: Optional[Tuple[int, float]]):
+    previous = _entries.pop(sub_id, None)
+    if previous is not None:
+        flight_id, target_price = previous
+        flight_targets = _targets[flight_id]
+        del flight_targets[bisect_left(flight_targets, (target_price, sub_id))]
+        if not flight_targets:
+            del _targets[flight_id]
+    if entry is not None:
+        flight_id, target_price = entry
+        insort(_targets.setdefault(flight_id, []), (target_price, sub_id))
+        _entries[sub_id] = entry
+
+
+def _change_locked(sub_id: int, entry: Optional[Tuple[int, float]]):
+    _set_locked(sub_id, entry)
+    if _rebuilds_in_progress:
+        _changes_during_rebuild.append((sub_id, entry))
+
+
+def rebuild(db: Session):
+    """
+    Reloads the index from the active subscriptions. Run at startup and every
+    SUBSCRIPTION_INDEX_REFRESH_MINUTES. Changes synced in this process while the
+    table is read are replayed onto the result, so none is lost; see
+    loaded_before for those made elsewhere.
+    """
+    global _ready, _rebuilds_in_progress, _loaded_before
+    with _lock:
+        _rebuilds_in_progress += 1
+        replay_from = len(_changes_during_rebuild)
+    try:
+        # Read before the table, on the DB clock the updatedAt trigger uses. A
+        # write that set its updatedAt earlier but committed after the table was
+        # read is covered by the grace period.
+        read_at = db.execute(
+            select(func.timezone("utc", func.clock_timestamp()))
+        ).scalar_one()
+        targets: Dict[int, List[Tuple[float, int]]] = {}
+        entries: Dict[int, Tuple[int, float]] = {}
+        for sub_id, flight_id, target_price in db.query(
+            models.Subscription.id,
+            models.Subscription.flightId,
+            models.Subscription.targetPrice,
+        ).filter(models.Subscription.isActive == True):
+            targets.setdefault(flight_id, []).append((target_price, sub_id))
+            entries[sub_id] = (flight_id, target_price)
+        for flight_targets in targets.values():
+            flight_targets.sort()
+        with _lock:
+            _targets.clear()
+            _targets.update(targets)
+            _entries.clear()
+            _entries.update(entries)
+            for sub_id, entry in _changes_during_rebuild[replay_from:]:
+                _set_locked(sub_id, entry)
+            _loaded_before = read_at - timedelta(
+                seconds=SUBSCRIPTION_INDEX_WRITE_GRACE_SECONDS
+            )
+            _ready = True
+    finally:
+        with _lock:
+            _rebuilds_in_progress -= 1
+            if not _rebuilds_in_progress:
+                _changes_during_rebuild.clear()
+    logger.info(f"Subscription index rebuilt with {len(entries)} active targets.")
+
+
+def sync(subscription: models.Subscription):
+    """Mirrors a created or updated subscription into the index."""
+    with _lock:
+        _change_locked(
+            subscription.id,
+            (
+                (subscription.flightId, subscription.targetPrice)
+                if subscription.isActive
+                else None
+            ),
+        )
+
+
+def discard(subscription_ids: Iterable[int]):
+    with _lock:
+        for sub_id in subscription_ids:
+            _change_locked(sub_id, None)
+
+
+def match(
+    price_changes: Sequence[Tuple[int, float, float]],
+) -> Dict[int, Tuple[float, float]]:
+    """
+    For (flightId, oldPriceEur, newPriceEur) changes, returns {subscriptionId:
+    (oldPriceEur, newPriceEur)} for every indexed target with new <= target <
+    old, found by bisecting each flight's sorted targets.
+    """
+    matched = {}
+    with _lock:
+        for flight_id, old_price_eur, new_price_eur in price_changes:
+            flight_targets = _targets.get(flight_id)
+            if not flight_targets or new_price_eur >= old_price_eur:
+                continue
+            start = bisect_left(flight_targets, (new_price_eur, -1))
+            end = bisect_left(flight_targets, (old_price_eur, -1))
+            for _, sub_id in flight_targets[start:end]:
+                matched[sub_id] = (old_price_eur, new_price_eur)
+    return matched
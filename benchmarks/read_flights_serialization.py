@@ -0,0 +1,138 @@
+"""
+Micro-benchmark for serializing the GET /flights/ response.
+
+Compares the original path (ORM objects -> from_orm -> dict -> FlightOut ->
+response_model validation -> json) with the column-row fast path used by
+read_flights (plain rows -> dicts with memoized booking URLs -> orjson) on
+synthetic flights, checks that both produce the same JSON and reports rows
+serialized per second. The booking URL cache is warm after the correctness
+check, as it is on a running server.
+
+    python -m benchmarks.read_flights_serialization [--rows 10000] [--iterations 5]
+"""
+
+import argparse
+import json
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api.v1.endpoints.flight import _flight_row_to_json
+from app.crud.flight import FLIGHT_LIST_COLUMNS
+from app.db import models, schemas
+from app.services import booking_url_service
+
+ROUTES = [
+    ("TUN", "ORY", "BJ"),
+    ("TUN", "CDG", "TU"),
+    ("MIR", "LYS", "BJ"),
+    ("DJE", "FRA", "TU"),
+]
+FlightRow = namedtuple("FlightRow", [column.key for column in FLIGHT_LIST_COLUMNS])
+
+
+def _synthetic_rows(count: int) -> List[tuple]:
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1)
+    rows = []
+    for i in range(count):
+        dep, arr, airline = ROUTES[i % len(ROUTES)]
+        price_eur = round(rng.uniform(60, 400), 2)
+        rows.append(
+            FlightRow(
+                id=i + 1,
+                departureDate=start + timedelta(days=i // len(ROUTES)),
+                price=price_eur,
+                priceEur=price_eur,
+                departureAirportCode=dep,
+                arrivalAirportCode=arr,
+                airlineCode=airline,
+                minPriceEur=round(price_eur * 0.9, 2),
+                maxPriceEur=round(price_eur * 1.2, 2),
+                lastChangedAt=start - timedelta(hours=i % 48),
+            )
+        )
+    return rows
+
+
+def _orm_rows(rows: List[tuple]):
+    """The (Flight, minPriceEur, maxPriceEur) tuples the old query returned."""
+    return [
+        (
+            models.Flight(
+                id=row.id,
+                departureDate=row.departureDate,
+                price=row.price,
+                priceEur=row.priceEur,
+                departureAirportCode=row.departureAirportCode,
+                arrivalAirportCode=row.arrivalAirportCode,
+                airlineCode=row.airlineCode,
+                lastChangedAt=row.lastChangedAt,
+            ),
+            row.minPriceEur,
+            row.maxPriceEur,
+        )
+        for row in rows
+    ]
+
+
+def serialize_orm_path(db_flights) -> bytes:
+    """The read_flights body as it was before the fast path, kept as the baseline."""
+    flights = [
+        schemas.FlightOut(
+            **{
+                k: v
+                for k, v in schemas.FlightOut.from_orm(flight).dict().items()
+                if k not in ("minPrice", "maxPrice", "bookingUrl")
+            },
+            minPrice=min_price,
+            maxPrice=max_price,
+            bookingUrl=booking_url_service.generate_booking_url(flight),
+        )
+        for flight, min_price, max_price in db_flights
+    ]
+    adapter = TypeAdapter(List[schemas.FlightOut])
+    validated = adapter.validate_python([flight.model_dump() for flight in flights])
+    return json.dumps(jsonable_encoder(adapter.dump_python(validated))).encode()
+
+
+def serialize_row_path(rows) -> bytes:
+    return orjson.dumps([_flight_row_to_json(row) for row in rows])
+
+
+def _rows_per_second(serializer: Callable[..., bytes], data, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serializer(data)
+    return len(data) * iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = _synthetic_rows(args.rows)
+    db_flights = _orm_rows(rows)
+    if json.loads(serialize_orm_path(db_flights)) != json.loads(
+        serialize_row_path(rows)
+    ):
+        raise SystemExit("Serializers disagree")
+    print(f"{len(rows)} rows, outputs match")
+
+    baseline = _rows_per_second(serialize_orm_path, db_flights, args.iterations)
+    fast = _rows_per_second(serialize_row_path, rows, args.iterations)
+    print(f"ORM + FlightOut + json: {baseline:>12,.0f} rows/s")
+    print(f"Column rows + orjson:   {fast:>12,.0f} rows/s")
+    print(f"Speed-up: {fast / baseline:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Micro-benchmark for the Tunisair per-day price extractor.
+
+Compares the lxml/XPath extractor used by the scraper with the original
+BeautifulSoup implementation on the saved per-day fixtures, checks that both
+produce identical records and reports records parsed per second.
+
+    python -m benchmarks.tunisair_extract [--iterations 200]
+"""
+
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from app.services.scraper_service import _extract_tunisair_prices
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+TND_TO_EUR = 0.29
+
+
+def extract_tunisair_prices_bs4(
+    html: str, is_eur_native: bool, conversion_rate: float
+) -> List[Dict[str, Any]]:
+    """The extractor as it was before the lxml fast path, kept as the baseline."""
+    soup = BeautifulSoup(html, "html.parser")
+    found_flights = []
+    for td in soup.find_all("td", class_="available"):
+        date_str = td.get("data-departure")
+        price_div = td.find("div", class_="val_price_offre")
+        if not (
+            date_str
+            and price_div
+            and (price_text := price_div.get_text(strip=True))
+            and price_text != "-"
+        ):
+            continue
+        try:
+            departure_date = datetime.strptime(date_str, "%Y-%m-%d")
+            flight_data = {}
+            if is_eur_native and "EUR" in price_text:
+                price_str = (
+                    price_text.replace(" ", "").replace(",", ".").replace("EUR", "")
+                )
+                price_val = round(float(price_str), 2)
+                flight_data = {"price": price_val, "priceEur": price_val}
+            elif not is_eur_native and "TND" in price_text:
+                price_str = (
+                    price_text.replace(" ", "").replace(",", ".").replace("TND", "")
+                )
+                price_tnd = round(float(price_str), 3)
+                flight_data = {
+                    "price": price_tnd,
+                    "priceEur": round(price_tnd * conversion_rate, 2),
+                }
+            else:
+                continue
+            flight_data["departureDate"] = departure_date
+            found_flights.append(flight_data)
+        except (ValueError, TypeError):
+            pass
+    return found_flights
+
+
+def _load_fixtures():
+    fixtures = []
+    for path in sorted(FIXTURES_DIR.glob("tunisair_per_day_*.html")):
+        fixtures.append((path.name, path.read_text(), path.stem.endswith("_eur")))
+    return fixtures
+
+
+def _records_per_second(
+    extractor: Callable[..., List[Dict[str, Any]]], fixtures, iterations: int
+) -> float:
+    records = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for _, html, is_eur_native in fixtures:
+            records += len(extractor(html, is_eur_native, TND_TO_EUR))
+    return records / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    fixtures = _load_fixtures()
+    for name, html, is_eur_native in fixtures:
+        expected = extract_tunisair_prices_bs4(html, is_eur_native, TND_TO_EUR)
+        actual = _extract_tunisair_prices(html, is_eur_native, TND_TO_EUR)
+        if actual != expected:
+            raise SystemExit(f"Extractors disagree on {name}")
+        print(f"{name}: {len(actual)} records, outputs match")
+
+    baseline = _records_per_second(
+        extract_tunisair_prices_bs4, fixtures, args.iterations
+    )
+    fast = _records_per_second(_extract_tunisair_prices, fixtures, args.iterations)
+    print(f"BeautifulSoup (html.parser): {baseline:>12,.0f} records/s")
+    print(f"lxml XPath fast path:        {fast:>12,.0f} records/s")
+    print(f"Speed-up: {fast / baseline:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,11 @@ from app.api.v1.endpoints import (
     airport,
     user,
 )
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.db.executor import run_db, shutdown_db_executor
+from app.db.migrate import apply_migrations
+from app.services import email_delivery, scheduler_service, subscription_index
+from app.db.session import engine
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,7 +32,14 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("✅ Main backend service starting up...")
+    apply_migrations(engine)
+    if subscription_index.SUBSCRIPTION_INDEX_ENABLED:
+        await run_db(subscription_index.rebuild)
+    scheduler_service.start_scheduler()
     yield
+    scheduler_service.shutdown_scheduler()
+    shutdown_db_executor()
+    email_delivery.shutdown_delivery_worker()
     logger.info("🛑 Main backend service shutting down.")
 
 
@@ -41,6 +53,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Link", "ETag"],
 )
 
 